@@ -0,0 +1,12 @@
+"""
+Sudoku Solver
+an importable sudoku solver, see README.md for the command line
+"""
+from .batch import read_puzzles, solve_file, solve_one, solve_parallel, solve_puzzles
+from .cache import SolutionCache, canonical_form
+from .grid import (PARTIAL, PIPELINE, SOLVED, TECHNIQUE_STAGES, TECHNIQUES, UNSOLVABLE, Cell, Contradiction, Grid,
+                   SolveResult, format_grid)
+from .instrument import TechniqueStats
+from .parser import InvalidPuzzleError, parse
+from .trace import Deduction
+from .variants import Variant, VariantGrid
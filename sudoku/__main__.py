@@ -0,0 +1,62 @@
+"""
+Command line entry point, run with python -m sudoku
+"""
+import argparse
+import sys
+
+from .batch import solve_file
+from .grid import Grid
+from .parser import InvalidPuzzleError
+
+grid0 = "000000000 018049000 950073860 600000980 500010003 074000006 097320045 000490120 000000000"
+grid1 = "006080900 309760800 040201007 930000000 081649230 000000089 100408090 002037501 003010700"
+grid2 = "108530600 020001000 040000008 805003009 004000000 000090200 309005002 000600070 010000000"
+prompt = "Please enter a solvable sudoku grid, row by row, with a space between each row and a 0 to represent an empty square:"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solves sudoku puzzles. With no puzzle file, asks for a single puzzle.")
+    parser.add_argument("puzzles", nargs="?", help="a file with one puzzle per line, or - to read from stdin")
+    parser.add_argument("-o", "--output", help="where to write the solutions, one per line (default: stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="how many processes to solve with, 0 for one per CPU (default: 1)")
+    parser.add_argument("-c", "--chunksize", type=int, default=64,
+                        help="how many puzzles a worker process is given at once (default: 64)")
+    parser.add_argument("-u", "--unordered", action="store_true",
+                        help="write solutions as soon as they are done, prefixed with the puzzle's position")
+    parser.add_argument("-v", "--vectorized", action="store_true",
+                        help="fill in singles on a whole chunk of puzzles at once with numpy, best with a large "
+                             "--chunksize like 4096")
+    parser.add_argument("--cache", type=int, default=0, metavar="SIZE",
+                        help="remember the solutions of up to SIZE puzzles, so repeats (even relabelled, reordered or "
+                             "transposed ones) aren't solved again (default: 0, no cache)")
+    args = parser.parse_args()
+
+    if args.puzzles is None:
+        input_grid = input(f"{prompt}\n (e.g. {grid1})\n").strip()
+        try:
+            result = Grid(input_grid).solve()
+        except InvalidPuzzleError as error:
+            print(f"That isn't a valid puzzle: {error}.")
+            return
+        if result.solved:
+            print("It is done: \n")
+            print(result.formatted_grid())
+        else:
+            print("This puzzle has no solution.")
+        return
+
+    in_file = sys.stdin if args.puzzles == "-" else open(args.puzzles)
+    out_file = sys.stdout if args.output is None else open(args.output, "w")
+    try:
+        solve_file(in_file, out_file, args.workers, args.chunksize, not args.unordered, args.vectorized,
+                   args.cache)
+    finally:
+        if in_file is not sys.stdin:
+            in_file.close()
+        if out_file is not sys.stdout:
+            out_file.close()
+
+
+if __name__ == "__main__":
+    main()
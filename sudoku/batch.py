@@ -0,0 +1,164 @@
+"""
+Solving many puzzles at once
+puzzles are read, solved, and written one at a time (or a few chunks at a time with solve_parallel()) so memory stays
+the same no matter how many puzzles there are
+"""
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from .cache import SolutionCache
+from .grid import PARTIAL, UNSOLVABLE, Grid
+from .parser import INVALID, InvalidPuzzleError
+from .vectorized import solve_batch, solve_vectorized
+
+
+def read_puzzles(lines):
+    """
+    reads puzzles one at a time, so only one is ever held in memory. Each puzzle is on its own line, either as 81
+    characters or as 9 rows separated with spaces (or another size, see parser.py). Empty cells can be '0' or '.',
+    anything after a '#' is a comment, and blank lines are skipped.
+    :param lines: any iterable of lines, like an open file or sys.stdin
+    :return: a generator of puzzles, each one a line Grid accepts (it is only checked when it is solved)
+    """
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        yield line
+
+
+_worker_cache = None  # each worker process's own SolutionCache, see _start_worker()
+
+
+def solve_one(puzzle, cache=None, time_limit=None):
+    """
+    :param puzzle: a puzzle Grid accepts
+    :param cache: a SolutionCache to look the puzzle up in first, or None to always solve it
+    :param time_limit: the most seconds to spend on the puzzle, or None for no limit
+    :return: the solution as a line, UNSOLVABLE if the puzzle has no solution, PARTIAL if it ran
+    out of time, or INVALID if it is malformed or gives a value twice in a unit
+    """
+    try:
+        if cache is None:
+            result = Grid(puzzle).solve(time_limit=time_limit)
+        else:
+            result = cache.solve(puzzle, time_limit)
+    except InvalidPuzzleError:
+        return INVALID
+    if result.status == PARTIAL:
+        return PARTIAL
+    return result.grid if result.solved else UNSOLVABLE
+
+
+def _start_worker(cache_size):
+    """
+    runs once in each worker process of solve_parallel(), caches aren't shared between processes
+    :param cache_size: how many puzzles the worker's cache holds, 0 for no cache
+    """
+    global _worker_cache
+    _worker_cache = SolutionCache(cache_size) if cache_size else None
+
+
+def solve_chunk(puzzles, time_limit=None):
+    """
+    what each worker process runs in solve_parallel()
+    :param puzzles: a list of puzzles Grid accepts
+    :param time_limit: the most seconds to spend on each puzzle, see solve_one()
+    :return: a list of their solutions, see solve_one()
+    """
+    return [solve_one(puzzle, _worker_cache, time_limit) for puzzle in puzzles]
+
+
+def solve_puzzles(puzzles, cache=None):
+    """
+    solves puzzles one at a time without printing anything
+    :param puzzles: any iterable of puzzles Grid accepts
+    :param cache: a SolutionCache to look each puzzle up in first, see solve_one()
+    :return: a generator of the solutions, see solve_one()
+    """
+    for puzzle in puzzles:
+        yield solve_one(puzzle, cache)
+
+
+def solve_parallel(puzzles, workers=None, chunksize=64, ordered=True, vectorized=False, cache_size=0):
+    """
+    solves puzzles on a pool of worker processes. Puzzles are handed out chunksize at a time, and only a couple of
+    chunks per worker are ever waiting to be solved, so memory stays the same no matter how many puzzles there are.
+    :param puzzles: any iterable of puzzles Grid accepts
+    :param workers: how many processes to solve with (default: one per CPU)
+    :param chunksize: how many puzzles a worker is given at once
+    :param ordered: if True the solutions come out in the same order as the puzzles. If False they come out as soon as
+    their chunk is done, as (position, solution) pairs where position is the puzzle's place in puzzles
+    :param vectorized: if True each chunk is solved with the numpy engine, see vectorized.solve_batch()
+    :param cache_size: if not 0, each worker keeps a SolutionCache of this many puzzles (not used when vectorized)
+    :return: a generator of the solutions, see solve_one()
+    """
+    workers = workers or os.cpu_count() or 1
+    solver = solve_batch if vectorized else solve_chunk
+    max_pending = workers * 2
+    puzzles = iter(puzzles)
+    chunks = iter(lambda: list(islice(puzzles, chunksize)), [])
+
+    with ProcessPoolExecutor(workers, initializer=_start_worker, initargs=(cache_size,)) as executor:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(solver, chunk))
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        else:
+            pending = {}  # future -> position of the chunk's first puzzle
+            position = 0
+            for chunk in chunks:
+                pending[executor.submit(solver, chunk)] = position
+                position += len(chunk)
+                while len(pending) >= max_pending:
+                    yield from _finished_chunks(pending)
+            while pending:
+                yield from _finished_chunks(pending)
+
+
+def _finished_chunks(pending):
+    """
+    waits for at least one chunk in pending to be solved and removes the finished ones from it
+    :param pending: a dictionary of solve_chunk() futures to the position of the chunk's first puzzle
+    :return: a generator of (position, solution) pairs for every puzzle in the finished chunks
+    """
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        start = pending.pop(future)
+        for offset, solution in enumerate(future.result()):
+            yield start + offset, solution
+
+
+def solve_file(in_file, out_file, workers=1, chunksize=64, ordered=True, vectorized=False, cache_size=0):
+    """
+    streams the solutions of every puzzle in in_file out to out_file, one line per puzzle in the same order
+    :param in_file: an open file of puzzles, see read_puzzles()
+    :param out_file: an open file to write the solutions to
+    :param workers: how many processes to solve with, see solve_parallel(). 0 means one per CPU
+    :param chunksize: how many puzzles a worker is given at once, or go into each numpy batch
+    :param ordered: if False solutions are written as soon as they are done, each line starting with the puzzle's
+    position in in_file (counting from 0)
+    :param vectorized: if True fill in singles on a whole chunk at once with numpy, see vectorized.py
+    :param cache_size: if not 0, look puzzles up in a SolutionCache of this many puzzles (one per worker) before
+    solving them, see cache.py
+    """
+    puzzles = read_puzzles(in_file)
+    if workers == 1 and ordered:
+        if vectorized:
+            solutions = solve_vectorized(puzzles, chunksize)
+        else:
+            solutions = solve_puzzles(puzzles, SolutionCache(cache_size) if cache_size else None)
+        for solution in solutions:
+            out_file.write(solution + "\n")
+    elif ordered:
+        for solution in solve_parallel(puzzles, workers, chunksize, vectorized=vectorized, cache_size=cache_size):
+            out_file.write(solution + "\n")
+    else:
+        for position, solution in solve_parallel(puzzles, workers, chunksize, False, vectorized, cache_size):
+            out_file.write(f"{position} {solution}\n")
@@ -0,0 +1,178 @@
+"""
+Benchmark
+times Grid.solve() over the bundled puzzle corpora (or any puzzle file) and reports puzzles per second, per puzzle
+latency percentiles, and peak memory. Run with python -m sudoku.benchmark, add --json for machine readable output that
+can be compared across releases.
+
+Every puzzle in the bundled corpora has a solution, so the benchmark exits with status 1 if any of them isn't solved.
+The regressions corpus keeps the puzzles that once broke the solver for that reason.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from .batch import read_puzzles
+from .grid import Grid
+
+CORPORA_DIR = os.path.join(os.path.dirname(__file__), "corpora")
+CORPORA = ("easy", "hard", "17clue", "regressions")  # graded from easiest to hardest, then the regression checks
+
+
+def corpus_path(name):
+    """
+    :param name: one of CORPORA
+    :return: the path to the bundled corpus file
+    """
+    if name not in CORPORA:
+        raise ValueError(f"unknown corpus {name!r}, pick one of {', '.join(CORPORA)}")
+    return os.path.join(CORPORA_DIR, name + ".txt")
+
+
+def load_puzzles(path):
+    """
+    :param path: a file with one puzzle per line, see read_puzzles()
+    :return: a list of every puzzle in the file
+    """
+    with open(path) as f:
+        return list(read_puzzles(f))
+
+
+def percentile(ordered, fraction):
+    """
+    :param ordered: a sorted, non-empty list of numbers
+    :param fraction: which percentile to take, between 0 and 1
+    :return: the nearest-rank percentile of ordered
+    """
+    rank = max(math.ceil(fraction * len(ordered)), 1) - 1
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def technique_totals(puzzles):
+    """
+    solves every puzzle once with instrumentation on and adds up the stats of each technique
+    :param puzzles: a list of puzzles Grid accepts
+    :return: a dictionary of technique name -> TechniqueStats.as_dict() totals
+    """
+    totals = {}
+    for puzzle in puzzles:
+        for name, stats in Grid(puzzle).solve(instrument=True).technique_stats.items():
+            total = totals.setdefault(name, {"calls": 0, "time": 0.0, "eliminated": 0, "placed": 0})
+            for key, value in stats.as_dict().items():
+                total[key] += value
+    return totals
+
+
+def run_benchmark(name, puzzles, repeat=1, techniques=False):
+    """
+    solves every puzzle repeat times, timing each solve on its own. Peak memory (and the technique stats) are measured
+    on separate passes so the tracing doesn't slow down the timed ones.
+    :param name: what to call the corpus in the report
+    :param puzzles: a list of puzzles Grid accepts
+    :param repeat: how many times to solve the whole corpus
+    :param techniques: if True, add the per technique totals from technique_totals() to the report
+    :return: a dictionary report, see the README for the fields
+    """
+    latencies = []
+    solved = 0
+    guesses = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for puzzle in puzzles:
+            solve_start = time.perf_counter()
+            result = Grid(puzzle).solve()
+            latencies.append(time.perf_counter() - solve_start)
+            solved += result.solved
+            guesses += result.stats["guesses"]
+    total = time.perf_counter() - started
+
+    tracemalloc.start()
+    for puzzle in puzzles:
+        Grid(puzzle).solve()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies.sort()
+    count = len(latencies)
+    report = {
+        "corpus": name,
+        "puzzles": count,
+        "solved": solved,
+        "guesses": guesses,
+        "total_seconds": total,
+        "puzzles_per_second": count / total if total else 0.0,
+        "latency_ms": {
+            "mean": 1000 * sum(latencies) / count,
+            "p50": 1000 * percentile(latencies, 0.50),
+            "p90": 1000 * percentile(latencies, 0.90),
+            "p99": 1000 * percentile(latencies, 0.99),
+            "max": 1000 * latencies[-1],
+        },
+        "peak_memory_bytes": peak_memory,
+    }
+    if techniques:
+        report["techniques"] = technique_totals(puzzles)
+    return report
+
+
+def format_report(report):
+    """
+    :param report: a report from run_benchmark()
+    :return: the report as a short human readable summary
+    """
+    latency = report["latency_ms"]
+    lines = [f"{report['corpus']}: {report['solved']}/{report['puzzles']} solved, "
+             f"{report['puzzles_per_second']:.1f} puzzles/s, "
+             f"latency ms p50 {latency['p50']:.2f} p90 {latency['p90']:.2f} p99 {latency['p99']:.2f} "
+             f"max {latency['max']:.2f}, peak memory {report['peak_memory_bytes'] / 1024:.1f} KiB"]
+    for name, stats in report.get("techniques", {}).items():
+        lines.append(f"    {name:<22} {stats['calls']:>7} calls {1000 * stats['time']:>9.2f} ms "
+                     f"{stats['eliminated']:>7} eliminated {stats['placed']:>6} placed")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the solver on puzzle corpora.")
+    parser.add_argument("corpora", nargs="*", default=list(CORPORA),
+                        help=f"bundled corpora to run, any of {', '.join(CORPORA)} (default: all of them)")
+    parser.add_argument("-f", "--file", action="append", default=[],
+                        help="also benchmark a puzzle file, can be given more than once")
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="how many times to solve each corpus (default: 1)")
+    parser.add_argument("-t", "--techniques", action="store_true",
+                        help="also report the calls, time, eliminations and placements of each technique")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    parser.add_argument("-o", "--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    runs = [(name, corpus_path(name)) for name in args.corpora] + [(path, path) for path in args.file]
+    reports = []
+    failed = []  # bundled corpora with puzzles that weren't solved
+    for name, path in runs:
+        reports.append(run_benchmark(name, load_puzzles(path), args.repeat, args.techniques))
+        if not args.json:
+            print(format_report(reports[-1]))
+        if name in CORPORA and reports[-1]["solved"] != reports[-1]["puzzles"]:
+            failed.append(name)
+
+    results = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "repeat": args.repeat,
+        "results": reports,
+    }
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if failed:
+        sys.exit(f"not every puzzle was solved in {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Solution cache
+an LRU cache in front of Grid.solve(). Puzzles are looked up by a canonical form, so a puzzle that only differs from
+one already solved by relabelling its values, reordering the rows (or columns) inside their bands, reordering the
+bands (or stacks), or transposing is found in the cache, and the cached solution is mapped back onto it.
+
+The canonical form orders lines by keys that don't depend on the order of the other lines or on the labels (how many
+givens a line has, and how many givens cross them), then relabels values by the order they first appear. Lines with
+the same key keep their original order, so some equivalent puzzles still get different keys; that only costs a cache
+miss, never a wrong solution.
+
+Only 9x9 puzzles are cached, other sizes are passed straight through to Grid.solve().
+"""
+import time
+from collections import OrderedDict
+
+from .grid import PARTIAL, Grid, SolveResult
+from .parser import parse
+
+
+def _line_keys(line, transposed):
+    """
+    works out a key for each row that doesn't change when the columns are reordered or the values relabelled: how
+    many givens the row has, how many givens the columns of those givens have, and how often their values are given
+    :param line: a puzzle as an 81 character line, with 0 for empty cells
+    :param transposed: if True, key the columns instead
+    :return: a list of the 9 keys
+    """
+    def cell(x, y):
+        return line[y * 9 + x] if transposed else line[x * 9 + y]
+
+    counts = [sum(cell(x, y) != "0" for y in range(9)) for x in range(9)]
+    crossing = [sum(cell(x, y) != "0" for x in range(9)) for y in range(9)]
+    frequency = {val: line.count(val) for val in "123456789"}
+    return [(-counts[x],
+             sorted(-crossing[y] for y in range(9) if cell(x, y) != "0"),
+             sorted(-frequency[cell(x, y)] for y in range(9) if cell(x, y) != "0"))
+            for x in range(9)]
+
+
+def _line_order(keys):
+    """
+    :param keys: the key of each of the 9 rows (or columns), see _line_keys()
+    :return: the rows in canonical order: bands sorted by their rows' keys, and the rows inside each band by key
+    """
+    bands = [sorted(range(band, band + 3), key=lambda x: keys[x]) for band in (0, 3, 6)]
+    bands.sort(key=lambda lines: [keys[x] for x in lines])
+    return [x for lines in bands for x in lines]
+
+
+def canonical_form(line):
+    """
+    :param line: a puzzle as an 81 character line, with 0 for empty cells
+    :return: (key, cells, relabel) where key is the canonical puzzle line, key[i] is relabel[line[cells[i]]], and
+    relabel maps every value (and "0") to its canonical value
+    """
+    best = None
+    for transposed in (False, True):
+        row_order = _line_order(_line_keys(line, transposed))
+        col_order = _line_order(_line_keys(line, not transposed))
+        if transposed:
+            cells = [y * 9 + x for x in row_order for y in col_order]
+        else:
+            cells = [x * 9 + y for x in row_order for y in col_order]
+
+        # values are relabelled in the order they first appear, the ones that never appear come last
+        relabel = {"0": "0"}
+        for i in cells:
+            if line[i] not in relabel:
+                relabel[line[i]] = str(len(relabel))
+        for val in "123456789":
+            if val not in relabel:
+                relabel[val] = str(len(relabel))
+
+        key = "".join(relabel[line[i]] for i in cells)
+        if best is None or key < best[0]:
+            best = (key, cells, relabel)
+    return best
+
+
+class SolutionCache:
+    """
+    solves puzzles through an LRU cache of canonical puzzle -> canonical solution
+    """
+
+    def __init__(self, maxsize=100000):
+        """
+        :param maxsize: int
+            The most puzzles to remember, the least recently used one is forgotten first
+        """
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # canonical puzzle -> (status, canonical solution)
+        self.hits = 0
+        self.misses = 0
+
+    def solve(self, puzzle, time_limit=None, max_steps=None):
+        """
+        :param puzzle: a puzzle Grid accepts
+        :param time_limit: the most seconds to spend solving it if it isn't in the cache, see Grid.solve()
+        :param max_steps: the most steps to take solving it if it isn't in the cache, see Grid.solve()
+        :return: a SolveResult like Grid.solve(), with stats["cache_hit"] saying whether it came from the cache
+        """
+        started = time.perf_counter()
+        line = parse(puzzle)
+        if len(line) != 81:
+            result = Grid(line).solve(time_limit=time_limit, max_steps=max_steps)
+            result.stats["cache_hit"] = False
+            return result
+        key, cells, relabel = canonical_form(line)
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            status, canonical_solution = entry
+            # undo the transform: cell cells[i] gets the original value of canonical_solution[i]
+            unlabel = {new: old for old, new in relabel.items()}
+            solution = ["0"] * 81
+            for i, val in zip(cells, canonical_solution):
+                solution[i] = unlabel[val]
+            stats = {"passes": 0, "guesses": 0, "steps": 0, "time": time.perf_counter() - started, "cache_hit": True}
+            return SolveResult("".join(solution), status, stats)
+
+        self.misses += 1
+        result = Grid(line).solve(time_limit=time_limit, max_steps=max_steps)
+        result.stats["cache_hit"] = False
+        if result.status == PARTIAL:
+            return result  # a bigger budget could still finish it
+        self.entries[key] = (result.status, "".join(relabel[result.grid[i]] for i in cells))
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return result
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,311 @@
+"""
+Binary corpora
+a compact on-disk format for big puzzle sets that is read through mmap instead of being parsed as text.
+
+A file is a 16 byte header (see HEADER) followed by fixed size records, so record i always starts at
+HEADER.size + i * RECORD_SIZE. Each record is the 81 cells, 4 bits each, high half of the byte first, then a 4 bit
+status (a STATUS_* value in solution files, 0 in puzzle files): 41 bytes. The 4 bit values are just hex digits, so a
+record is bytes.fromhex(line + status) and its line is record.hex()[:81].
+
+Solutions go in a parallel file of the same size, solution i in record i. Worker processes open both files themselves
+and write their solutions straight into the mapped output, so no puzzle or solution text passes between processes.
+
+Run python -m sudoku.corpus to convert to and from text and to solve a corpus. Records only hold 9x9 puzzles.
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from .batch import INVALID, read_puzzles
+from .grid import PARTIAL, UNSOLVABLE, Grid
+from .parser import InvalidPuzzleError, parse
+
+MAGIC = b"SDKU"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")  # magic, version, record size, number of records
+RECORD_SIZE = 41
+
+STATUS_NONE = 0  # a puzzle, or a solution that hasn't been written yet
+STATUS_SOLVED = 1
+STATUS_UNSOLVABLE = 2
+STATUS_INVALID = 3
+STATUS_PARTIAL = 4
+
+# the answers that aren't a solution, see batch.solve_one() -> their status
+ANSWER_STATUS = {UNSOLVABLE: STATUS_UNSOLVABLE, INVALID: STATUS_INVALID, PARTIAL: STATUS_PARTIAL}
+EMPTY_LINE = "0" * 81
+
+
+def encode_record(line, status=STATUS_NONE):
+    """
+    :param line: an 81 character line of the values 0-9, see parser.parse()
+    :param status: the STATUS_* value to store with it
+    :return: the 41 byte record
+    """
+    return bytes.fromhex(f"{line}{status}")
+
+
+def decode_record(record):
+    """
+    :param record: a 41 byte record
+    :return: the record's 81 character line
+    """
+    return record.hex()[:81]
+
+
+def _open_map(path, write=False):
+    """
+    :param path: a corpus file
+    :param write: if True, map it so records can be written
+    :return: (file, mmap, count) after checking the header
+    """
+    f = open(path, "r+b" if write else "rb")
+    try:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if write else mmap.ACCESS_READ)
+    except ValueError:  # an empty file can't be mapped
+        f.close()
+        raise ValueError(f"{path} is not a puzzle corpus")
+    magic, version, record_size, count = HEADER.unpack_from(data) if len(data) >= HEADER.size else (b"", 0, 0, 0)
+    if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE or \
+            len(data) < HEADER.size + count * RECORD_SIZE:
+        data.close()
+        f.close()
+        raise ValueError(f"{path} is not a version {VERSION} puzzle corpus")
+    return f, data, count
+
+
+class CorpusReader:
+    """
+    reads the records of a corpus file through mmap. Indexing and iterating give 81 character lines Grid accepts
+    """
+
+    def __init__(self, path):
+        """
+        :param path: str
+            The corpus file
+        """
+        self.path = path
+        self.file, self.map, self.count = _open_map(path)
+
+    def record(self, i):
+        """
+        :param i: which record, counting from 0
+        :return: the record's 41 bytes
+        """
+        if not 0 <= i < self.count:
+            raise IndexError(f"record {i} is out of range, the corpus has {self.count}")
+        start = HEADER.size + i * RECORD_SIZE
+        return self.map[start:start + RECORD_SIZE]
+
+    def status(self, i):
+        """
+        :param i: which record, counting from 0
+        :return: the record's STATUS_* value
+        """
+        return self.record(i)[-1] & 0xF
+
+    def records(self, start=0, stop=None):
+        """
+        :param start: the first record
+        :param stop: one past the last record (default: the end)
+        :return: a generator of the records' 41 bytes
+        """
+        stop = self.count if stop is None else min(stop, self.count)
+        data = self.map
+        for offset in range(HEADER.size + start * RECORD_SIZE, HEADER.size + stop * RECORD_SIZE, RECORD_SIZE):
+            yield data[offset:offset + RECORD_SIZE]
+
+    def lines(self, start=0, stop=None):
+        """
+        :return: a generator of the records' lines, see records()
+        """
+        for record in self.records(start, stop):
+            yield record.hex()[:81]
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return decode_record(self.record(i))
+
+    def __iter__(self):
+        return self.lines()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CorpusWriter:
+    """
+    writes a corpus file one record at a time, the header's count is filled in by close()
+    """
+
+    def __init__(self, path):
+        """
+        :param path: str
+            The corpus file, it is overwritten
+        """
+        self.file = open(path, "wb")
+        self.count = 0
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, 0))
+
+    def write(self, puzzle, status=STATUS_NONE):
+        """
+        :param puzzle: a 9x9 puzzle Grid accepts, it is checked with parser.parse()
+        :param status: the STATUS_* value to store with it
+        """
+        line = parse(puzzle)
+        if len(line) != 81:
+            raise InvalidPuzzleError(f"a corpus only holds 9x9 puzzles, not {len(line)} cells")
+        self.file.write(encode_record(line, status))
+        self.count += 1
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, self.count))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def write_corpus(path, puzzles):
+    """
+    :param path: the corpus file to write
+    :param puzzles: any iterable of puzzles Grid accepts. Invalid ones, and ones that aren't 9x9, are written as empty
+    STATUS_INVALID records, so every puzzle keeps its position
+    :return: how many puzzles were written
+    """
+    with CorpusWriter(path) as writer:
+        for puzzle in puzzles:
+            try:
+                writer.write(puzzle)
+            except InvalidPuzzleError:
+                writer.write(EMPTY_LINE, STATUS_INVALID)
+    return writer.count
+
+
+def create_solution_file(path, count):
+    """
+    makes an empty solution file with room for count records, every one STATUS_NONE until it is written
+    :param path: the file to make, it is overwritten
+    :param count: how many records
+    """
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, count))
+        f.truncate(HEADER.size + count * RECORD_SIZE)
+
+
+def solve_range(in_path, out_path, start, stop):
+    """
+    solves records start to stop of a corpus and writes their solutions into the same records of the solution file.
+    This is what each worker process runs in solve_corpus().
+    :param in_path: the corpus file
+    :param out_path: the solution file, see create_solution_file()
+    :param start: the first record
+    :param stop: one past the last record
+    :return: how many records were solved
+    """
+    with CorpusReader(in_path) as reader:
+        f, out, _ = _open_map(out_path, write=True)
+        try:
+            offset = HEADER.size + start * RECORD_SIZE
+            for record in reader.records(start, stop):
+                try:
+                    result = Grid.from_record(record).solve()
+                    answer = result.grid if result.solved else result.status
+                except InvalidPuzzleError:
+                    answer = INVALID
+                status = ANSWER_STATUS.get(answer)
+                record = encode_record(EMPTY_LINE, status) if status else encode_record(answer, STATUS_SOLVED)
+                out[offset:offset + RECORD_SIZE] = record
+                offset += RECORD_SIZE
+            out.flush()
+        finally:
+            out.close()
+            f.close()
+    return stop - start
+
+
+def solve_corpus(in_path, out_path, workers=1, chunksize=4096):
+    """
+    solves every puzzle in a corpus into a solution file of the same size
+    :param in_path: the corpus file
+    :param out_path: where to write the solutions, it is overwritten
+    :param workers: how many processes to solve with, 0 for one per CPU
+    :param chunksize: how many records a worker is given at once
+    :return: how many puzzles were solved
+    """
+    with CorpusReader(in_path) as reader:
+        count = len(reader)
+    create_solution_file(out_path, count)
+    starts = range(0, count, chunksize)
+    stops = [min(start + chunksize, count) for start in starts]
+    if workers == 1:
+        for start, stop in zip(starts, stops):
+            solve_range(in_path, out_path, start, stop)
+    else:
+        with ProcessPoolExecutor(workers or os.cpu_count() or 1) as executor:
+            # the workers write the solutions themselves, all that comes back is how many
+            sum(executor.map(solve_range, repeat(in_path), repeat(out_path), starts, stops))
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Converts and solves binary puzzle corpora.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="turn a text file of puzzles (or - for stdin) into a corpus")
+    pack.add_argument("puzzles")
+    pack.add_argument("corpus")
+    unpack = commands.add_parser("unpack", help="print a corpus or solution file as text, one puzzle per line")
+    unpack.add_argument("corpus")
+    unpack.add_argument("-n", "--count", type=int, help="only print the first COUNT records")
+    unpack.add_argument("-o", "--output", help="where to write the lines (default: stdout)")
+    solve = commands.add_parser("solve", help="solve a corpus into a solution file")
+    solve.add_argument("corpus")
+    solve.add_argument("solutions")
+    solve.add_argument("-w", "--workers", type=int, default=1,
+                       help="how many processes to solve with, 0 for one per CPU (default: 1)")
+    solve.add_argument("-c", "--chunksize", type=int, default=4096,
+                       help="how many records a worker process is given at once (default: 4096)")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        in_file = sys.stdin if args.puzzles == "-" else open(args.puzzles)
+        try:
+            count = write_corpus(args.corpus, read_puzzles(in_file))
+        finally:
+            if in_file is not sys.stdin:
+                in_file.close()
+        print(f"packed {count} puzzles", file=sys.stderr)
+    elif args.command == "unpack":
+        names = {STATUS_UNSOLVABLE: UNSOLVABLE, STATUS_INVALID: INVALID, STATUS_PARTIAL: PARTIAL}
+        out_file = sys.stdout if args.output is None else open(args.output, "w")
+        try:
+            with CorpusReader(args.corpus) as reader:
+                for record in reader.records(0, args.count):
+                    out_file.write(names.get(record[-1] & 0xF, decode_record(record)) + "\n")
+        finally:
+            if out_file is not sys.stdout:
+                out_file.close()
+    else:
+        count = solve_corpus(args.corpus, args.solutions, args.workers, args.chunksize)
+        print(f"solved {count} puzzles", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
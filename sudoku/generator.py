@@ -0,0 +1,264 @@
+"""
+Puzzle generator
+makes new puzzles: a random filled grid, then clues are taken out one at a time in a random order, each one only if
+the puzzle still has a unique solution. Every puzzle is graded by the hardest technique Grid.solve() needs, see
+DIFFICULTIES.
+
+A target difficulty steers the digging: a clue only comes out if the puzzle can still be solved with that difficulty's
+techniques. Anything the techniques solve without search has exactly one solution, so those puzzles skip the
+uniqueness check. Puzzles that end up easier than the target are thrown away and a new grid is dug, and the middle
+difficulties are the rare ones, so they take a few tries each. A target clue count stops the digging once the puzzle is
+down to it.
+
+Run python -m sudoku.generator to write puzzles to a file, with --workers to generate on several processes.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .grid import PARTIAL, PIPELINE, Contradiction, Grid
+from .units import geometry
+
+# from easiest to hardest, each one can use every technique of the ones before it
+DIFFICULTIES = ("singles", "locked_candidates", "pairs", "x_wing", "advanced", "search")
+
+# the pipeline each difficulty is solved with, see Grid.solve(). "advanced" is every technique, "search" needs more
+DIFFICULTY_PIPELINES = {
+    "singles": PIPELINE[:1],
+    "locked_candidates": PIPELINE[:2],
+    "pairs": PIPELINE[:4],
+    "x_wing": PIPELINE[:5],
+    "advanced": PIPELINE[:-1],
+    "search": PIPELINE,
+}
+
+# the techniques to run before searching for a second solution. Search finishes off what forced placement leaves
+# quicker than the more expensive techniques would
+UNIQUENESS_PIPELINE = PIPELINE[:1]
+
+MAX_TRIES = 10000  # how many grids generate_puzzle() digs before giving up on its targets
+
+
+class GeneratedPuzzle:
+    """
+    what the generator makes
+    """
+
+    def __init__(self, puzzle, solution, difficulty):
+        """
+        :param puzzle: str
+            The puzzle as a line, row by row, with 0 for each empty cell
+        :param solution: str
+            Its only solution
+        :param difficulty: str
+            One of DIFFICULTIES
+        """
+        self.puzzle = puzzle
+        self.solution = solution
+        self.difficulty = difficulty
+
+    @property
+    def clues(self):
+        return len(self.puzzle) - self.puzzle.count("0")
+
+    def __repr__(self):
+        return f"GeneratedPuzzle({self.puzzle!r}, {self.solution!r}, {self.difficulty!r})"
+
+
+def random_solution(rng, box_size=3):
+    """
+    :param rng: a random.Random
+    :param box_size: how many cells across a box is, 3 for a 9x9 grid
+    :return: a random filled grid as a line. The boxes on the diagonal don't share any units, so each is filled with a
+    random order of the values, and the solver fills in the rest. On a 4x4 grid the two diagonal boxes often leave
+    nothing that fits in the others, so those are thrown away and filled again.
+    """
+    geo = geometry(box_size)
+    while True:
+        values = ["0"] * geo.cell_count
+        for b in range(box_size):
+            symbols = list(geo.symbols)
+            rng.shuffle(symbols)
+            for i, val in zip(geo.boxes[b * (box_size + 1)], symbols):
+                values[i] = val
+        result = Grid("".join(values)).solve()
+        if result.solved:
+            return result.grid
+
+
+def grade(puzzle):
+    """
+    :param puzzle: a puzzle Grid accepts, with a solution
+    :return: the easiest of DIFFICULTIES whose techniques solve it. Each difficulty carries on from where the one
+    before it got stuck, so nothing is solved twice
+    """
+    grid = Grid(puzzle)
+    for difficulty in DIFFICULTIES:
+        result = grid.solve(pipeline=DIFFICULTY_PIPELINES[difficulty])
+        if result.solved:
+            return difficulty
+        if result.status != PARTIAL:
+            break
+    raise ValueError("the puzzle has no solution")
+
+
+def _unique_without(line, solution, index):
+    """
+    :param line: a puzzle with the unique solution solution, with cell index just emptied
+    :return: True if line still has only that solution. Any other solution would have to differ from it at index,
+    so it is enough to look for one with a different value there.
+    """
+    grid = Grid(line)
+    try:
+        grid.eliminate(index, grid.geometry.value_bits[solution[index]])
+    except Contradiction:
+        return True
+    return grid.count_solutions(1, UNIQUENESS_PIPELINE) == 0
+
+
+def dig(solution, rng, difficulty=None, clues=None):
+    """
+    takes clues out of a filled grid for as long as the puzzle keeps a unique solution
+    :param solution: a filled grid as a line
+    :param rng: a random.Random, for the order the cells are tried in
+    :param difficulty: if not None, only take a clue out if the puzzle can still be solved at this difficulty
+    :param clues: if not None, stop once the puzzle is down to this many clues
+    :return: the puzzle as a line
+    """
+    values = list(solution)
+    cells = list(range(len(values)))
+    rng.shuffle(cells)
+    pipeline = None if difficulty in (None, "search") else DIFFICULTY_PIPELINES[difficulty]
+    given = len(values)
+    for i in cells:
+        if clues is not None and given <= clues:
+            break
+        values[i] = "0"
+        line = "".join(values)
+        if pipeline is None:
+            keep = _unique_without(line, solution, i)
+        else:
+            keep = Grid(line).solve(pipeline=pipeline).solved
+        if keep:
+            given -= 1
+        else:
+            values[i] = solution[i]
+    return "".join(values)
+
+
+def generate_puzzle(rng, difficulty=None, clues=None, box_size=3, max_tries=MAX_TRIES):
+    """
+    :param rng: a random.Random
+    :param difficulty: one of DIFFICULTIES the puzzle has to be, or None for any
+    :param clues: the most clues the puzzle can have, or None to take out as many as possible
+    :param box_size: how many cells across a box is, 3 for a 9x9 grid
+    :param max_tries: how many grids to dig before giving up, some targets can't be met together
+    :return: a GeneratedPuzzle
+    """
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(f"unknown difficulty {difficulty!r}, pick from {', '.join(DIFFICULTIES)}")
+    for _ in range(max_tries):
+        solution = random_solution(rng, box_size)
+        puzzle = dig(solution, rng, difficulty, clues)
+        if clues is not None and len(puzzle) - puzzle.count("0") > clues:
+            continue
+        puzzle_difficulty = grade(puzzle)
+        if difficulty is None or puzzle_difficulty == difficulty:
+            return GeneratedPuzzle(puzzle, solution, puzzle_difficulty)
+    raise RuntimeError(f"no {difficulty or 'unique'} puzzle with at most {clues} clues in {max_tries} tries")
+
+
+def generate_chunk(count, seed, difficulty=None, clues=None, box_size=3):
+    """
+    what each worker process runs in generate_parallel()
+    :param count: how many puzzles to make
+    :param seed: the seed of the chunk's random.Random
+    :return: a list of GeneratedPuzzles, see generate_puzzle() for the rest
+    """
+    rng = random.Random(seed)
+    return [generate_puzzle(rng, difficulty, clues, box_size) for _ in range(count)]
+
+
+def generate_puzzles(count, difficulty=None, clues=None, box_size=3, seed=None):
+    """
+    makes puzzles one at a time
+    :param count: how many puzzles to make
+    :param seed: the seed of the random.Random, None for a different set every time
+    :return: a generator of GeneratedPuzzles, see generate_puzzle() for the rest
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield generate_puzzle(rng, difficulty, clues, box_size)
+
+
+def generate_parallel(count, workers=None, chunksize=16, difficulty=None, clues=None, box_size=3, seed=None):
+    """
+    makes puzzles on a pool of worker processes, chunksize at a time. Each chunk gets its own seed, drawn from seed, so
+    the same seed, count, and chunksize always give the same puzzles however many workers there are.
+    :param count: how many puzzles to make
+    :param workers: how many processes to generate with (default: one per CPU)
+    :param chunksize: how many puzzles a worker makes at once
+    :param seed: the seed the chunks' seeds are drawn from, None for a different set every time
+    :return: a generator of GeneratedPuzzles in chunk order, see generate_puzzle() for the rest
+    """
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(seed)
+    max_pending = workers * 2
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        for start in range(0, count, chunksize):
+            size = min(chunksize, count - start)
+            pending.append(executor.submit(generate_chunk, size, rng.getrandbits(64), difficulty, clues, box_size))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates graded sudoku puzzles with a unique solution.")
+    parser.add_argument("-n", "--count", type=int, default=100, help="how many puzzles to make (default: 100)")
+    parser.add_argument("-d", "--difficulty", choices=DIFFICULTIES, help="only make puzzles of this difficulty")
+    parser.add_argument("-c", "--clues", type=int, help="the most clues a puzzle can have")
+    parser.add_argument("-s", "--box-size", type=int, default=3,
+                        help="how many cells across a box is, 2 to 5 (default: 3, a 9x9 grid)")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="how many processes to generate with, 0 for one per CPU (default: 1)")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="how many puzzles a worker process makes at once (default: 16)")
+    parser.add_argument("--seed", type=int, help="make the same puzzles every run")
+    parser.add_argument("-g", "--grades", action="store_true",
+                        help="follow each puzzle with its difficulty and clue count on the same line")
+    parser.add_argument("-o", "--output", help="where to write the puzzles, one per line (default: stdout)")
+    args = parser.parse_args()
+
+    if args.workers == 1:
+        puzzles = generate_puzzles(args.count, args.difficulty, args.clues, args.box_size, args.seed)
+    else:
+        puzzles = generate_parallel(args.count, args.workers, args.chunksize, args.difficulty, args.clues,
+                                    args.box_size, args.seed)
+    out_file = sys.stdout if args.output is None else open(args.output, "w")
+    difficulties = Counter()
+    started = time.perf_counter()
+    try:
+        for generated in puzzles:
+            difficulties[generated.difficulty] += 1
+            if args.grades:
+                out_file.write(f"{generated.puzzle} # {generated.difficulty} {generated.clues}\n")
+            else:
+                out_file.write(generated.puzzle + "\n")
+    finally:
+        if out_file is not sys.stdout:
+            out_file.close()
+    elapsed = time.perf_counter() - started
+    counts = ", ".join(f"{difficulties[name]} {name}" for name in DIFFICULTIES if difficulties[name])
+    print(f"generated {args.count} puzzles in {elapsed:.2f}s, {60 * args.count / elapsed:.0f} per minute ({counts})",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1131 @@
+"""
+Sudoku Solver
+reads in a 9x9 sudoku square with blanks filled in as '0'
+separates the puzzle into 9 rows, 9 columns, and 9 3x3 squares
+rows, columns, and squares will be made up of Cell objects
+    - squares will be 0 | 1 | 2
+                      3 | 4 | 5
+                      6 | 7 | 8
+
+4x4, 16x16, and 25x25 squares work the same way, see parser.py for how they are written and units.py for their
+tables. A Grid finds everything that depends on its size through its geometry.
+
+candidates are stored as integer masks with a bit per value, bit (d - 1) being set means d is still a legal value for
+that cell (the 10th value of a 16x16 grid, A, is bit 9)
+"""
+import time
+from itertools import combinations
+
+from .parser import InvalidPuzzleError, parse
+from .units import BOX_SIZES, STANDARD, geometry
+
+# the 9x9 candidate mask tables, a Grid of any size has its own in its geometry
+ALL_CANDIDATES = STANDARD.all_candidates  # every value is still legal
+VALUE_BITS = STANDARD.value_bits  # "1" -> 0b1, "2" -> 0b10, ...
+
+
+SOLVED = "solved"  # every cell is filled in
+UNSOLVABLE = "unsolvable"  # the puzzle has no solution
+PARTIAL = "partial"  # the solve ran out of time or steps, or the pipeline had no search, before finishing
+
+
+def format_grid(line):
+    """
+    :param line: a grid as a line, row by row, 81 characters for a 9x9 grid
+    :return: the grid laid out in rows, with lines between the boxes
+    """
+    geo = geometry(BOX_SIZES[len(line)])
+    n = geo.box_size
+    g_v = []
+    for i in range(geo.size):
+        row = line[i * geo.size:(i + 1) * geo.size]
+        g_v.append("|".join(row[y:y + n] for y in range(0, geo.size, n)))
+        if i % n == n - 1 and i != geo.size - 1:
+            g_v.append("-" * (geo.size + n - 1))
+
+    return "\n".join(g_v)
+
+
+# the techniques solve() can run on a changed unit. Each one lists the Grid methods to call with the number of a
+# changed (row, column, box)
+TECHNIQUE_STAGES = {
+    "forced_placement": (("row_forced_placement",), ("col_forced_placement",), ("box_forced_placement",)),
+    "locked_candidates": ((), (), ("locked_col", "locked_row")),
+    "naked_pairs": (("naked_row_pair",), ("naked_col_pair",), ("naked_box_pair",)),
+    "hidden_pairs": (("hidden_row_pair",), ("hidden_col_pair",), ("hidden_box_pair",)),
+    "x_wing": (("x_wing_row",), ("x_wing_col",), ()),
+    "triples": (("naked_row_triple", "hidden_row_triple"), ("naked_col_triple", "hidden_col_triple"),
+                ("naked_box_triple", "hidden_box_triple")),
+    "xy_wing": ((), (), ("xy_wing",)),
+    "swordfish": (("swordfish_row",), ("swordfish_col",), ()),
+    "quads": (("naked_row_quad", "hidden_row_quad"), ("naked_col_quad", "hidden_col_quad"),
+              ("naked_box_quad", "hidden_box_quad")),
+    "jellyfish": (("jellyfish_row",), ("jellyfish_col",), ()),
+}
+
+# the techniques solve() runs by default, cheapest first, then search once they are stuck
+PIPELINE = ("forced_placement", "locked_candidates", "naked_pairs", "hidden_pairs", "x_wing", "triples", "xy_wing",
+            "swordfish", "quads", "jellyfish", "search")
+
+
+def pipeline_stages(pipeline, technique_stages=TECHNIQUE_STAGES):
+    """
+    :param pipeline: names from TECHNIQUE_STAGES in the order to run them, optionally ending with "search"
+    :param technique_stages: the table to look the names up in, variant grids have their own
+    :return: (stages, search), the stages to run (see STAGES) and whether to search once they are stuck
+    """
+    names = list(pipeline)
+    search = "search" in names
+    if search:
+        if names.index("search") != len(names) - 1:
+            raise ValueError("search has to come last in a pipeline")
+        names.pop()
+    for name in names:
+        if name not in technique_stages:
+            raise ValueError(f"unknown technique {name!r}, pick from {', '.join(technique_stages)} or search")
+    return tuple(technique_stages[name] for name in names), search
+
+
+# grids with at least this many cells back up search with a trail of changes, smaller ones are quicker to copy
+TRAIL_CELLS = 256
+
+# the stages of the default pipeline. The first one is cheap and also runs after every guess search() makes
+STAGES = pipeline_stages(PIPELINE)[0]
+
+# every Grid method solve() runs
+TECHNIQUES = ("box_check", "box_forced_placement", "row_forced_placement", "col_forced_placement",
+              "locked_col", "locked_row", "naked_box_pair", "naked_col_pair", "naked_row_pair",
+              "hidden_box_pair", "hidden_col_pair", "hidden_row_pair", "x_wing_row", "x_wing_col",
+              "naked_row_triple", "naked_col_triple", "naked_box_triple",
+              "hidden_row_triple", "hidden_col_triple", "hidden_box_triple", "xy_wing",
+              "swordfish_row", "swordfish_col", "naked_row_quad", "naked_col_quad", "naked_box_quad",
+              "hidden_row_quad", "hidden_col_quad", "hidden_box_quad", "jellyfish_row", "jellyfish_col",
+              "search")
+
+
+class Contradiction(Exception):
+    """
+    raised when the grid can no longer be solved, i.e. a cell has run out of legal values or a value would be placed
+    twice in the same row, column, or box
+    """
+
+
+class BudgetExceeded(Exception):
+    """
+    raised inside solve() when its time_limit or max_steps runs out
+    """
+
+
+def to_mask(values, value_bits=VALUE_BITS):
+    """
+    :param values: a value or list/string of values
+    :param value_bits: the value -> bit table of the grid's size, see units.Geometry
+    :return: the candidate mask with a bit set for each of the values
+    """
+    mask = 0
+    for val in values:
+        mask |= value_bits.get(val, 0)
+    return mask
+
+
+class Cell:
+    """
+    has an (x,y) coordinate, a value, and a list of possible values.
+    The value and the possible values live in the Grid's flat arrays, the Cell just knows where to find them, so a
+    Cell is only a Grid and an index with no __dict__ of its own.
+    """
+
+    __slots__ = ("grid", "index")
+
+    def __init__(self, grid, x_coord, y_coord):
+        """
+        :param grid: Grid
+            The Grid holding the Cell's value and candidates
+        :param x_coord: int
+            Lets the Cell know where it is on the X-axis for grouping purposes
+        :param y_coord: int
+            Lets the Cell know where it is on the Y-axis for grouping purposes
+        """
+        self.grid = grid
+        self.index = x_coord * grid.geometry.size + y_coord  # where the Cell lives in the Grid's flat arrays
+
+    @property
+    def x_coord(self):
+        return self.grid.geometry.row_of[self.index]
+
+    @property
+    def y_coord(self):
+        return self.grid.geometry.col_of[self.index]
+
+    @property
+    def value(self):
+        """
+        The Cell's value, 0 for an empty cell
+        """
+        return self.grid.values[self.index]
+
+    @property
+    def legal_values(self):
+        """
+        A list of all legal values that could fill in this cell
+        """
+        return list(self.grid.geometry.mask_values[self.grid.candidates[self.index]])
+
+    def get_coords(self):
+        """
+
+        :return: the (x,y) position of the Cell
+        """
+        return self.x_coord, self.y_coord
+
+    def update(self, illegal_values):
+        """
+        :param illegal_values: a list/string of values to be removed from consideration of potential values in the
+        given Cell
+
+        if after update is run there is only 1 remaining legal value the Cell will automatically fill itself in.
+        """
+        self.grid.eliminate(self.index, to_mask(illegal_values, self.grid.geometry.value_bits))
+
+    def set(self, kept_values):
+        """
+        :param kept_values: a value or list of values you want to set as the only possible candidates for the Cell
+        """
+        geo = self.grid.geometry
+        self.grid.eliminate(self.index, geo.all_candidates & ~to_mask(kept_values, geo.value_bits))
+
+    def __str__(self):
+        return self.value
+
+
+class SolveResult:
+    """
+    what Grid.solve() returns
+    """
+
+    def __init__(self, grid, status, stats):
+        """
+        :param grid: str
+            The grid as a line, row by row, 81 characters for a 9x9 grid. Unsolved cells are left as 0
+        :param status: str
+            SOLVED, UNSOLVABLE, or PARTIAL
+        :param stats: dict
+            How the solve went: the number of passes (times an expensive stage of techniques had units to look at),
+            the number of values search() guessed, the number of steps (see Grid.solve()), and the time it took in
+            seconds
+        """
+        self.grid = grid
+        self.status = status
+        self.stats = stats
+        self.technique_stats = None  # technique name -> TechniqueStats, only filled in by solve(instrument=True)
+
+    @property
+    def solved(self):
+        return self.status == SOLVED
+
+    def formatted_grid(self):
+        return format_grid(self.grid)
+
+    def __repr__(self):
+        return f"SolveResult({self.grid!r}, {self.status!r}, {self.stats!r})"
+
+
+class Grid:
+    technique_stages = TECHNIQUE_STAGES  # the techniques a pipeline can name, see solve()
+    default_stages = STAGES  # the stages run when no pipeline is given
+    techniques = TECHNIQUES  # every method solve(instrument=True) keeps stats for
+
+    def __init__(self, grid_values, geo=None):
+        """
+        :param grid_values: a single string of the values in the grid, row by row, top to bottom, either as 81
+        characters or with each row separated with a SPACE. A list of 9 row strings is also acceptable. Empty cells
+        can be a 0 or a '.'. 4x4, 16x16, and 25x25 grids are given the same way, see parser.py.
+
+        Building a Grid doesn't solve it, call solve() for that. A malformed puzzle, or one that gives a value twice in
+        a row, column, or box, raises parser.InvalidPuzzleError here.
+        :param geo: the Geometry of a variant grid, see variants.py. Left out, it is the classic grid of grid_values'
+        size
+        """
+        self._load(parse(grid_values, geo), geo)
+
+    def _load(self, line, geo=None):
+        """
+        fills in a new Grid, see __init__()
+        :param line: the values of the cells, already checked by parse() or from a binary corpus record
+        :param geo: see __init__()
+        """
+        self._cells = None  # List of Cell lists, only made if something asks for them, see grid
+
+        # The tables for the grid's size, shared with every other Grid of that size
+        self.geometry = geo = geo or geometry(BOX_SIZES[len(line)])
+
+        self.values = list(line)  # The value of every cell, row by row, "0" for an empty cell
+
+        self.unsolved = self.values.count("0")  # How many cells are still empty, kept up to date by place()
+
+        # The candidate mask of every cell, row by row. Only empty cells have legal values left to consider
+        self.candidates = [geo.all_candidates if val == "0" else 0 for val in self.values]
+
+        self.s_rows = [0] * geo.size  # A mask for each row with the solved values in that row
+
+        self.s_cols = [0] * geo.size  # A mask for each column with the solved values in that column
+
+        self.s_boxes = [0] * geo.size  # A mask for each box with the solved values in that box
+
+        for index, val in enumerate(self.values):
+            if val != "0":
+                bit = geo.value_bits[val]
+                self.s_rows[geo.row_of[index]] |= bit
+                self.s_cols[geo.col_of[index]] |= bit
+                self.s_boxes[geo.box_of[index]] |= bit
+
+        self.solved = (self.s_rows, self.s_cols, self.s_boxes)  # The solved masks of each kind of unit, by unit kind
+
+        self.dirty = 0  # a bit for each unit whose candidates changed since the scheduler last looked
+
+        self.stages = self.default_stages  # the stages of techniques to run, see use_pipeline()
+
+        self.pending = [0] * len(self.stages)  # for each stage, a bit for each unit it still needs to look at
+
+        self.passes = 0  # times an expensive stage had units to look at
+
+        self.guesses = 0  # how many values search() has tried
+
+        self.steps = 0  # how many times a technique looked at a unit, plus guesses
+
+        self.max_steps = None  # the step count solve() has to stop at, if any
+
+        self.deadline = None  # the time.perf_counter() solve() has to stop at, if any
+
+        self.budgeted = False  # True while solve() has a time_limit or max_steps to check
+
+        self.pausing = False  # True while trace() has the scheduler pause after every technique call, see stage_steps()
+
+        self._positions = {}  # lines -> (candidates, table) of the last line_value_positions(), see fish()
+
+        self.trail = None  # (index, old candidates, placed bit) of every change since the first snapshot(), see restore()
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        :param record: a 41 byte puzzle record from a binary corpus, see corpus.py
+        :return: a Grid of the record's puzzle. Its nibbles are the values, and the corpus writer checked them already,
+        so the puzzle isn't parsed again
+        :raises InvalidPuzzleError: if the record is marked as an invalid puzzle
+        """
+        from .corpus import STATUS_INVALID
+        if record[-1] & 0xF == STATUS_INVALID:
+            raise InvalidPuzzleError("the record is marked as an invalid puzzle")
+        grid = cls.__new__(cls)
+        grid._load(record.hex()[:81], STANDARD)
+        return grid
+
+    @property
+    def grid(self):
+        """
+        The Cells of the grid as a list of rows. The techniques work on the flat arrays, so the Cells are only made
+        the first time they are asked for.
+        """
+        if self._cells is None:
+            size = self.geometry.size
+            self._cells = [[Cell(self, x, y) for y in range(size)] for x in range(size)]
+        return self._cells
+
+    def place(self, index, val):
+        """
+        fills in the cell at index with val. Only the row, column, and box the cell is in are updated, and val is
+        removed from the legal values of the cell's peers.
+        :param index: the cell's position in the flat arrays
+        :param val: the value to fill the cell in with
+        """
+        x, y, box_num, units, peers = self.geometry.placements[index]
+        bit = self.geometry.value_bits[val]
+        if bit & (self.s_rows[x] | self.s_cols[y] | self.s_boxes[box_num]):
+            raise Contradiction
+
+        if self.trail is not None:
+            self.trail.append((index, self.candidates[index], bit))
+        self.values[index] = val
+        self.candidates[index] = 0
+        self.unsolved -= 1
+        self.dirty |= units
+        self.s_rows[x] |= bit
+        self.s_cols[y] |= bit
+        self.s_boxes[box_num] |= bit
+
+        for peer in peers:
+            self.eliminate(peer, bit)
+
+    def eliminate(self, index, illegal_mask):
+        """
+        removes the values in illegal_mask from the candidates of the cell at index, filling in the cell if only one
+        value is left
+        :param index: the cell's position in the flat arrays
+        :param illegal_mask: a candidate mask of the values to remove
+        """
+        legal = self.candidates[index]
+        remaining = legal & ~illegal_mask
+        if remaining != legal:
+            if not remaining:
+                raise Contradiction
+            if self.trail is not None:
+                self.trail.append((index, legal, 0))
+            self.candidates[index] = remaining
+            self.dirty |= self.geometry.cell_unit_masks[index]
+            # If there is only one possible legal value then fill in the cell with that value
+            if not remaining & (remaining - 1):
+                self.place(index, self.geometry.symbols[remaining.bit_length() - 1])
+
+    def box_check(self, box_num):
+        """
+        box_check() goes through each Cell in a certain box and removes the solved values from the list of legal values
+        for that Cell
+        :param box_num: the box's numerical identifier. Read from left to right, then top to bottom.
+
+        """
+        geo = self.geometry
+        for i in geo.boxes[box_num]:
+            if self.values[i] == "0":
+                self.eliminate(i, self.s_boxes[box_num] | self.s_cols[geo.col_of[i]] | self.s_rows[geo.row_of[i]])
+
+    def forced_placement(self, cells, solved):
+        """
+        Goes through each Cell in cells and finds which potential values only appear once. Then it fills in the
+        appropriate Cells.
+        :param cells: the flat indices of the cells in a row, column, or box
+        :param solved: the mask of values already solved in those cells
+        :return: True if any Cell was filled in
+        """
+        once = 0
+        twice = 0
+        for i in cells:
+            twice |= once & self.candidates[i]
+            once |= self.candidates[i]
+
+        # a value that is neither solved nor legal anywhere can never be placed
+        if (once | solved) != self.geometry.all_candidates:
+            raise Contradiction
+
+        # values that only appear once, ignoring the ones that are already solved
+        forced = once & ~twice & ~solved
+        if forced:
+            for i in cells:
+                if self.candidates[i] & forced:
+                    # two values can't both be forced into the same cell
+                    both = self.candidates[i] & forced
+                    if both & (both - 1):
+                        raise Contradiction
+                    self.eliminate(i, ~(self.candidates[i] & forced))
+        return bool(forced)
+
+    def box_forced_placement(self, box_num):
+        """
+        Goes through each Cell in a box and finds which potential values only appear once. Then it fills in the appropriate Cells.
+        :param box_num: the box's ID number
+        """
+        self.forced_placement(self.geometry.boxes[box_num], self.s_boxes[box_num])
+
+    def row_forced_placement(self, row):
+        """
+        Goes through each Cell in a row and finds which values only appear once. Then it fills in the appropriate Cells.
+        :param row: which row it's checking
+        """
+        self.forced_placement(self.geometry.rows[row], self.s_rows[row])
+
+    def col_forced_placement(self, col):
+        """
+        Goes through each Cell in a column and finds which values only appear once. Then it fills in the appropriate
+        Cells.
+        :param col: which column it's checking
+        """
+        self.forced_placement(self.geometry.cols[col], self.s_cols[col])
+
+    def locked_line(self, intersections):
+        """
+        Checks to see if there are any legal values in a box that only exist where it crosses a certain row or column,
+        and removes them from the other Cells in that same row or column.
+        :param intersections: the box's entry in the geometry's box_rows or box_cols
+        """
+        for line, inside, box_rest, line_rest in intersections:
+            included = 0
+            excluded = 0
+            for i in inside:
+                included |= self.candidates[i]
+            for i in box_rest:
+                excluded |= self.candidates[i]
+
+            # the values unique to the line...
+            locked = included & ~excluded
+            if locked:
+                # ...are removed from the rest of the line
+                for i in line_rest:
+                    self.eliminate(i, locked)
+
+    def locked_row(self, box_num):
+        """
+        Checks to see if there are any legal values in a box that only exist in a certain row, and removes them from
+        other Cells in that same row.
+        :param box_num:
+        :return:
+        """
+        self.locked_line(self.geometry.box_rows[box_num])
+
+    def locked_col(self, box_num):
+        """
+        Checks to see if there are any legal values in a box that only exist in a certain column, and removes them from
+        other Cells in that same column.
+        :param box_num:
+        :return:
+        """
+        self.locked_line(self.geometry.box_cols[box_num])
+
+    def naked_pair(self, cells):
+        """
+        checks to see if two Cells both only have the same 2 legal values available to them. If they do, it removes
+        those values as options from the other cells
+        :param cells: the flat indices of the cells in a row, column, or box
+        """
+        # the cells that only have 2 legal values
+        bit_count = self.geometry.bit_count
+        pairs = [i for i in cells if bit_count[self.candidates[i]] == 2]
+
+        while len(pairs) > 1:  # while there's still cells to compare to
+            cell_a = pairs.pop()  # remove a cell the list
+            for cell_b in pairs:  # check it against the remaining cells
+                pair = self.candidates[cell_a]
+                if self.candidates[cell_b] == pair:  # if they have matching legal values
+                    for i in cells:
+                        if i != cell_a and i != cell_b:  # except for the cells we're looking at
+                            self.eliminate(i, pair)  # remove those legal values from all other cells
+
+    def naked_box_pair(self, box_num):
+        """
+        checks to see if two Cells both only have the same 2 legal values available to them. If they do, it removes
+        those values as options from other Cells in the box
+        :param box_num: which box we're looking at
+        """
+        self.naked_pair(self.geometry.boxes[box_num])
+
+    def naked_col_pair(self, col):
+        """
+        checks to see if two Cells both only have the same 2 legal values available to them. If they do, it removes
+        those values from other Cells in the column
+        :param col: what column it's looking at.
+        :return:
+        """
+        self.naked_pair(self.geometry.cols[col])
+
+    def naked_row_pair(self, row):
+        """
+        checks to see if two Cells both only have the same 2 legal values available to them. If they do, it removes
+        those values from other Cells in the row
+        :param row: which row it's looking at
+        :return:
+        """
+        self.naked_pair(self.geometry.rows[row])
+
+    def value_locations(self, cells, solved):
+        """
+        :param cells: the flat indices of the cells in a row, column, or box
+        :param solved: the mask of values already solved in those cells
+        :return: a dictionary of each unsolved value's bit to a mask of the positions (within cells) it is legal in
+        """
+        value_locations = {}
+        for bit in self.geometry.bits:
+            # prevents solved values from being checked unnecessarily
+            if bit & solved:
+                continue
+            positions = 0
+            for pos, i in enumerate(cells):
+                if self.candidates[i] & bit:
+                    positions |= 1 << pos
+            value_locations[bit] = positions
+        return value_locations
+
+    def hidden_pair(self, cells, value_locations):
+        """
+        checks to see if a pair of numbers are only available in two cells and removes all other legal values from
+        those cells.
+        :param cells: the flat indices of the cells in a row, column, or box
+        :param value_locations: the positions each unsolved value is legal in, see value_locations()
+        """
+        # make a list of all values that only appear twice
+        bit_count = self.geometry.bit_count
+        hidden_options = [bit for bit, positions in value_locations.items() if bit_count[positions] == 2]
+
+        # check if those values appear in the same two cells
+        while len(hidden_options) >= 2:
+            value_a = hidden_options.pop()
+            for val in hidden_options:
+                if value_locations[value_a] == value_locations[val]:
+                    # if they do remove all other values from those cells
+                    for pos, i in enumerate(cells):
+                        if value_locations[val] & (1 << pos):
+                            self.eliminate(i, ~(val | value_a))
+                    hidden_options.remove(val)  # remove matching value to avoid extra loops
+                    break
+
+    def hidden_box_pair(self, box_num):
+        """
+        checks to see if a pair of numbers are only available in two cells in a given box and removes all other legal values from the cell.
+        :param box_num: which box we're looking at
+        """
+        cells = self.geometry.boxes[box_num]
+        self.hidden_pair(cells, self.value_locations(cells, self.s_boxes[box_num]))
+
+    def hidden_row_pair(self, row):
+        """
+        checks to see if a pair of numbers are only available in two cells in a given row and removes all other legal values from the cell.
+        :param row: which row we're looking at
+        """
+        cells = self.geometry.rows[row]
+        self.hidden_pair(cells, self.value_locations(cells, self.s_rows[row]))
+
+    def hidden_col_pair(self, col):
+        """
+        checks to see if a pair of numbers are only available in two cells in a given col and removes all other legal values from the cell.
+        :param col: which column we're looking at
+        """
+        cells = self.geometry.cols[col]
+        self.hidden_pair(cells, self.value_locations(cells, self.s_cols[col]))
+
+    def naked_subset(self, cells, size):
+        """
+        checks to see if size Cells between them only have size legal values available to them. If they do, those
+        values have to go in those Cells, so they are removed from the other cells. naked_pair() is the size 2 case.
+        :param cells: the flat indices of the cells in a row, column, or box
+        :param size: how many Cells (and values) to look for, 3 for triples and 4 for quads
+        """
+        # the cells that could be part of one, cells with more legal values than size can't be
+        bit_count = self.geometry.bit_count
+        options = [i for i in cells if 2 <= bit_count[self.candidates[i]] <= size]
+        for subset in combinations(options, size):
+            union = 0
+            for i in subset:
+                if not self.candidates[i]:
+                    break  # filled in by an earlier subset, it can't be part of this one
+                union |= self.candidates[i]
+            else:
+                if bit_count[union] == size:
+                    for i in cells:
+                        if i not in subset:
+                            self.eliminate(i, union)
+
+    def hidden_subset(self, cells, value_locations, size):
+        """
+        checks to see if size values are only available in size cells between them. If they are, those cells can't
+        hold anything else, so all other legal values are removed from them. hidden_pair() is the size 2 case.
+        :param cells: the flat indices of the cells in a row, column, or box
+        :param value_locations: the positions each unsolved value is legal in, see value_locations()
+        :param size: how many values (and Cells) to look for, 3 for triples and 4 for quads
+        """
+        # the values that could be part of one, values with more positions than size can't be
+        bit_count = self.geometry.bit_count
+        options = [bit for bit, positions in value_locations.items() if 2 <= bit_count[positions] <= size]
+        for subset in combinations(options, size):
+            positions = 0
+            values = 0
+            for bit in subset:
+                positions |= value_locations[bit]
+                values |= bit
+            if bit_count[positions] == size:
+                for pos, i in enumerate(cells):
+                    if positions & (1 << pos):
+                        self.eliminate(i, ~values)
+
+    def naked_row_triple(self, row):
+        self.naked_subset(self.geometry.rows[row], 3)
+
+    def naked_col_triple(self, col):
+        self.naked_subset(self.geometry.cols[col], 3)
+
+    def naked_box_triple(self, box_num):
+        self.naked_subset(self.geometry.boxes[box_num], 3)
+
+    def naked_row_quad(self, row):
+        self.naked_subset(self.geometry.rows[row], 4)
+
+    def naked_col_quad(self, col):
+        self.naked_subset(self.geometry.cols[col], 4)
+
+    def naked_box_quad(self, box_num):
+        self.naked_subset(self.geometry.boxes[box_num], 4)
+
+    def hidden_row_triple(self, row):
+        cells = self.geometry.rows[row]
+        self.hidden_subset(cells, self.value_locations(cells, self.s_rows[row]), 3)
+
+    def hidden_col_triple(self, col):
+        cells = self.geometry.cols[col]
+        self.hidden_subset(cells, self.value_locations(cells, self.s_cols[col]), 3)
+
+    def hidden_box_triple(self, box_num):
+        cells = self.geometry.boxes[box_num]
+        self.hidden_subset(cells, self.value_locations(cells, self.s_boxes[box_num]), 3)
+
+    def hidden_row_quad(self, row):
+        cells = self.geometry.rows[row]
+        self.hidden_subset(cells, self.value_locations(cells, self.s_rows[row]), 4)
+
+    def hidden_col_quad(self, col):
+        cells = self.geometry.cols[col]
+        self.hidden_subset(cells, self.value_locations(cells, self.s_cols[col]), 4)
+
+    def hidden_box_quad(self, box_num):
+        cells = self.geometry.boxes[box_num]
+        self.hidden_subset(cells, self.value_locations(cells, self.s_boxes[box_num]), 4)
+
+    def line_value_positions(self, lines):
+        """
+        :param lines: the geometry's rows or cols
+        :return: a table of the positions (within the line) each value is legal in, table[line][value - 1]. The
+        table is kept until the candidates change, so all the lines of a fish stage share one.
+        """
+        geo = self.geometry
+        cached = self._positions.get(lines is geo.rows)
+        if cached is not None and cached[0] == self.candidates:
+            return cached[1]
+        table = [[0] * geo.size for _ in range(geo.size)]
+        for line, cells in enumerate(lines):
+            line_positions = table[line]
+            for pos, i in enumerate(cells):
+                for v in geo.mask_indices[self.candidates[i]]:
+                    line_positions[v] |= 1 << pos
+        self._positions[lines is geo.rows] = (self.candidates.copy(), table)
+        return table
+
+    def fish(self, base_line, size, lines, solved, crossing_lines):
+        """
+        looks for fish with base_line as one of their base lines: a value whose legal positions in size parallel lines
+        all fall in the same size crossing lines. The value has to go in those crossings, so it is removed from the
+        rest of the crossing lines. X-wings are size 2, swordfish 3, and jellyfish 4.
+        :param base_line: the row or column that changed
+        :param size: how many lines make up the fish
+        :param lines: the geometry's rows or cols
+        :param solved: s_rows or s_cols
+        :param crossing_lines: cols or rows, the lines crossing lines
+        """
+        bit_count = self.geometry.bit_count
+        table = self.line_value_positions(lines)
+        for v, value in enumerate(self.geometry.bits):
+            base_positions = table[base_line][v]
+            if value & solved[base_line] or not 2 <= bit_count[base_positions] <= size:
+                continue
+            # the other lines the value is legal in few enough places to be part of the fish
+            positions = {}
+            for line in range(len(lines)):
+                if line != base_line and 2 <= bit_count[table[line][v]] <= size:
+                    positions[line] = table[line][v]
+
+            for subset in combinations(positions, size - 1):
+                covered = base_positions
+                for line in subset:
+                    covered |= positions[line]
+                if bit_count[covered] == size:
+                    fish_lines = subset + (base_line,)
+                    for pos in range(len(lines)):
+                        if covered & (1 << pos):
+                            for other, i in enumerate(crossing_lines[pos]):
+                                if other not in fish_lines:
+                                    self.eliminate(i, value)
+
+    def x_wing_row(self, row):
+        self.fish(row, 2, self.geometry.rows, self.s_rows, self.geometry.cols)
+
+    def x_wing_col(self, col):
+        self.fish(col, 2, self.geometry.cols, self.s_cols, self.geometry.rows)
+
+    def swordfish_row(self, row):
+        self.fish(row, 3, self.geometry.rows, self.s_rows, self.geometry.cols)
+
+    def swordfish_col(self, col):
+        self.fish(col, 3, self.geometry.cols, self.s_cols, self.geometry.rows)
+
+    def jellyfish_row(self, row):
+        self.fish(row, 4, self.geometry.rows, self.s_rows, self.geometry.cols)
+
+    def jellyfish_col(self, col):
+        self.fish(col, 4, self.geometry.cols, self.s_cols, self.geometry.rows)
+
+    def xy_wing(self, box_num):
+        """
+        looks for xy-wings pivoting on a Cell in the box: a pivot with legal values {x, y}, and two Cells it can see
+        (the pincers) with {x, z} and {y, z}. Whichever value the pivot takes, one of the pincers has to be z, so z is
+        removed from every Cell that can see both pincers.
+        :param box_num: which box the pivots are in
+        """
+        geo = self.geometry
+        bit_count = geo.bit_count
+        for pivot in geo.boxes[box_num]:
+            pivot_values = self.candidates[pivot]
+            if bit_count[pivot_values] != 2:
+                continue
+            # peers sharing exactly one value with the pivot, and one other value
+            pincers = [i for i in geo.peers[pivot]
+                       if bit_count[self.candidates[i]] == 2 and bit_count[self.candidates[i] & pivot_values] == 1]
+            for pincer_a, pincer_b in combinations(pincers, 2):
+                a = self.candidates[pincer_a]
+                b = self.candidates[pincer_b]
+                z = a & b & ~pivot_values
+                # the pincers share z, and between them hold both the pivot's values
+                if z and (a | b) & pivot_values == pivot_values:
+                    for i in geo.peer_sets[pincer_a] & geo.peer_sets[pincer_b]:
+                        if i != pivot:
+                            self.eliminate(i, z)
+
+    def solve(self, instrument=False, pipeline=None, time_limit=None, max_steps=None):
+        """
+        attempts to solve the sudoku puzzle. Only the rows, columns, and boxes that changed are looked at again: the
+        cheap techniques run until they can't fill anything else in, then each more expensive stage runs on the units
+        that changed since it last ran, going back to the cheap techniques whenever it changes something. Once no
+        stage has anything left to look at, it searches for the rest of the solution.
+        :param instrument: if True, keep per technique stats (see instrument.py) in the result's technique_stats
+        :param pipeline: the names of the techniques to run, in order, see PIPELINE (the default) and
+        TECHNIQUE_STAGES. Leave out "search" to only fill in what the techniques can. The givens are always cleared
+        out of the candidates first (box_check()), everything else can be left out or reordered. The first technique
+        also runs after every guess.
+        :param time_limit: the most seconds to spend, or None for no limit
+        :param max_steps: the most steps this call can take, a step being a technique looking at one unit or a guess,
+        or None for no limit
+        :return: a SolveResult, whose stats only count this call. If the time or steps run out it stops with PARTIAL
+        and the grid as far as the techniques got, leaving out anything search guessed.
+        """
+        search = self.use_pipeline(pipeline)
+
+        instrumentation = None
+        if instrument:
+            from .instrument import Instrumentation
+            instrumentation = Instrumentation(self, list(self.techniques))
+            instrumentation.install()
+
+        started = time.perf_counter()
+        # the counters keep going across calls, this one's budget and stats only count what it does itself
+        passes, guesses, steps = self.passes, self.guesses, self.steps
+        self.max_steps = None if max_steps is None else steps + max_steps
+        self.deadline = None if time_limit is None else started + time_limit
+        self.budgeted = max_steps is not None or time_limit is not None
+        snapshot = None
+        try:
+            self.run_techniques()
+            if self.is_solved():
+                status = SOLVED
+            elif not search:
+                status = PARTIAL
+            else:
+                snapshot = self.snapshot() if self.budgeted else None
+                status = SOLVED if self.search() else UNSOLVABLE
+        except Contradiction:
+            status = UNSOLVABLE
+        except BudgetExceeded:
+            status = PARTIAL
+            if snapshot is not None:
+                self.restore(snapshot)  # guesses aren't deductions, take them back out
+        finally:
+            self.budgeted = False
+            if instrumentation is not None:
+                instrumentation.uninstall()
+
+        stats = {"passes": self.passes - passes, "guesses": self.guesses - guesses, "steps": self.steps - steps,
+                 "time": time.perf_counter() - started}
+        result = SolveResult(self.to_line(), status, stats)
+        if instrumentation is not None:
+            result.technique_stats = instrumentation.stats
+        return result
+
+    def trace(self, pipeline=None):
+        """
+        solves the puzzle the same way solve() does, one deduction at a time, for hints and step by step explanations.
+        Nothing is done until the next deduction is asked for, so stopping after the first one only costs as much as
+        finding it, and solve() itself is left as it is.
+        :param pipeline: the techniques to run, see solve()
+        :return: a generator of trace.Deductions, see trace.py. The grid is left as far as the deductions got
+        """
+        from .trace import deductions
+        return deductions(self, pipeline)
+
+    def use_pipeline(self, pipeline):
+        """
+        sets the stages solve(), count_solutions() and trace() run, for this call only: leaving pipeline out goes back
+        to default_stages
+        :param pipeline: the names of the techniques to run, see solve(), or None for the default pipeline
+        :return: True if it searches once the techniques are stuck
+        """
+        if pipeline is None:
+            stages, search = self.default_stages, True
+        else:
+            stages, search = pipeline_stages(pipeline, self.technique_stages)
+        if stages is not self.stages:
+            self.stages = stages
+            self.pending = [0] * len(stages)
+        return search
+
+    def check_budget(self):
+        """
+        raises BudgetExceeded if solve() has run out of steps or time
+        """
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise BudgetExceeded
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise BudgetExceeded
+
+    def run_techniques(self):
+        """
+        runs the techniques until none of them can change anything else
+        :return: the number of passes, i.e. times an expensive stage had units to look at
+        """
+        for _ in self.technique_steps():
+            pass
+        return self.passes
+
+    def technique_steps(self):
+        """
+        run_techniques(), as a generator that pauses after every technique call while self.pausing is set
+        """
+        pausing = self.pausing
+        # clear the given values out of every empty cell, and have every stage look at every unit once
+        for i in range(self.geometry.size):
+            self.box_check(i)
+            if pausing:
+                yield
+        self.dirty = self.geometry.all_units
+
+        stage = 0
+        while stage < len(self.stages) and not self.is_solved():
+            yield from self.stage_steps(stage)
+            # anything that changed has to go through the cheap techniques again first
+            stage = 0 if self.dirty else stage + 1
+
+    def count_solutions(self, limit=2, pipeline=None):
+        """
+        counts how many solutions the puzzle has, stopping as soon as it finds limit of them. The techniques run first,
+        since nothing they remove could be part of any solution, so checking a puzzle is unique (limit=2) costs about
+        the same as solving it.
+        :param limit: the most solutions to look for
+        :param pipeline: the techniques to run before searching, see solve(). Search always runs
+        :return: the number of solutions, no more than limit
+        """
+        self.use_pipeline(pipeline)
+        count = 0
+        try:
+            self.run_techniques()
+            for _ in self.solutions():
+                count += 1
+                if count >= limit:
+                    break
+        except Contradiction:
+            pass
+        return count
+
+    def is_unique(self, pipeline=None):
+        """
+        :param pipeline: the techniques to run before searching, see count_solutions()
+        :return: True if the puzzle has exactly one solution
+        """
+        return self.count_solutions(2, pipeline) == 1
+
+    def stage_steps(self, stage):
+        """
+        runs a stage's techniques on every unit it still needs to look at. The cheap stage (0) keeps going until
+        nothing it does changes anything. An expensive stage that had units to look at counts as a pass.
+        :param stage: which of self.stages to run
+        :return: a generator that pauses after every technique call while self.pausing is set. trace() reads the
+        deductions out of the grid at each pause, everyone else runs it through without pausing
+        """
+        unit_places = self.geometry.unit_places
+        all_candidates = self.geometry.all_candidates
+        solved = self.solved
+        pausing = self.pausing
+        ran = False
+        while True:
+            units = self.take_pending(stage)
+            if not units:
+                break
+            ran = True
+
+            while units:
+                unit = (units & -units).bit_length() - 1  # the lowest set bit
+                units ^= 1 << unit
+                kind, number = unit_places[unit]
+                if solved[kind][number] != all_candidates:
+                    self.steps += 1
+                    if self.budgeted:
+                        self.check_budget()
+                    for name in self.stages[stage][kind]:
+                        getattr(self, name)(number)
+                        if pausing:
+                            yield
+
+            if stage:
+                break
+        if ran and stage:
+            self.passes += 1
+
+    def take_pending(self, stage):
+        """
+        hands the units that changed to every stage, and takes the ones stage still needs to look at
+        :param stage: which of self.stages is about to run
+        :return: a bit for each unit stage has to look at now
+        """
+        if self.dirty:
+            for i in range(len(self.pending)):
+                self.pending[i] |= self.dirty
+            self.dirty = 0
+        units = self.pending[stage]
+        self.pending[stage] = 0
+        return units
+
+    def save_state(self):
+        """
+        :return: a copy of everything place() and eliminate() can change, to be handed back to restore_state()
+        """
+        return (self.values.copy(), self.candidates.copy(), self.s_rows.copy(), self.s_cols.copy(),
+                self.s_boxes.copy(), self.unsolved, self.dirty, self.pending.copy())
+
+    def restore_state(self, state):
+        """
+        puts the grid back the way it was when state was saved
+        :param state: the result of save_state()
+        """
+        values, candidates, s_rows, s_cols, s_boxes, self.unsolved, self.dirty, pending = state
+        self.values[:] = values
+        self.candidates[:] = candidates
+        self.s_rows[:] = s_rows
+        self.s_cols[:] = s_cols
+        self.s_boxes[:] = s_boxes
+        self.pending[:] = pending
+
+    def snapshot(self):
+        """
+        marks the grid's current state so restore() can go back to it. On grids of TRAIL_CELLS or more nothing is
+        copied: from the first snapshot on, place() and eliminate() keep a trail of what they change, and restore()
+        undoes the trail back to the mark, so branching costs as much as the changes made on the branch. The arrays
+        of smaller grids are quicker to copy (see save_state()) than a trail is to keep and undo.
+        :return: a snapshot to hand to restore()
+        """
+        if self.geometry.cell_count < TRAIL_CELLS:
+            return self.save_state()
+        if self.trail is None:
+            self.trail = []
+        return len(self.trail), self.dirty, self.pending.copy()
+
+    def restore(self, snapshot):
+        """
+        puts the grid back the way it was when snapshot was taken. Snapshots taken after it can't be restored any
+        more, but it and the ones before it still can.
+        :param snapshot: the result of snapshot()
+        """
+        if self.trail is None:
+            self.restore_state(snapshot)
+            return
+        mark, self.dirty, pending = snapshot
+        trail = self.trail
+        candidates = self.candidates
+        placements = self.geometry.placements
+        for index, old, bit in reversed(trail[mark:]):
+            candidates[index] = old
+            if bit:  # the cell was filled in with bit's value, empty it and take the value out of its units again
+                x, y, box_num, _, _ = placements[index]
+                self.values[index] = "0"
+                self.unsolved += 1
+                self.s_rows[x] ^= bit
+                self.s_cols[y] ^= bit
+                self.s_boxes[box_num] ^= bit
+        del trail[mark:]
+        self.pending[:] = pending
+
+    def search(self):
+        """
+        searches for the rest of the solution, see solutions()
+        :return: True if the grid was solved, False if there is no solution
+        """
+        for _ in self.solutions():
+            return True
+        return False
+
+    def solutions(self):
+        """
+        backtracking search, starting from the legal values the techniques have left. It guesses each legal value of
+        the empty cell with the fewest of them, and undoes the guess if it leads to a Contradiction.
+        :return: a generator that pauses with the grid filled in every time it finds a solution. Carrying on undoes
+        it to look for the next one. While self.pausing is set it also pauses after every technique call, see
+        stage_steps()
+        """
+        best = self.best_cell()
+        if best is None:
+            yield
+            return
+
+        snapshot = self.snapshot()
+        for val in self.geometry.mask_values[self.candidates[best]]:
+            self.guesses += 1
+            self.steps += 1
+            if self.budgeted:
+                self.check_budget()
+            try:
+                self.place(best, val)
+                if self.stages:
+                    # fill in what the cheap techniques can from the guess, pausing if trace() wants it to
+                    yield from self.stage_steps(0)
+            except Contradiction:
+                self.restore(snapshot)
+                continue
+            yield from self.solutions()
+            self.restore(snapshot)
+
+    def best_cell(self):
+        """
+        :return: the index of the empty cell with the fewest legal values, the one search guesses first, or None if
+        every cell is filled in
+        """
+        bit_count = self.geometry.bit_count
+        best = None
+        best_count = self.geometry.size + 1
+        for i in range(self.geometry.cell_count):
+            if self.values[i] == "0" and bit_count[self.candidates[i]] < best_count:
+                best = i
+                best_count = bit_count[self.candidates[i]]
+                if best_count == 2:  # cells with one legal value are already filled in
+                    break
+        return best
+
+    def is_solved(self):
+        return not self.unsolved
+
+    def check(self):
+        """
+        checks the grid is still consistent, for grids that were changed some other way than through place() and
+        eliminate(), which raise a Contradiction as soon as a change would break it
+        :raises Contradiction: if an empty cell has no legal values left, a value is in a row, column, or box twice, or
+        the solved values of a unit don't match the values in it
+        """
+        geo = self.geometry
+        for i, val in enumerate(self.values):
+            if val == "0" and not self.candidates[i]:
+                raise Contradiction
+        solved = [mask for masks in self.solved for mask in masks]  # in the order of geo.units
+        for unit, cells in enumerate(geo.units):
+            mask = 0
+            for i in cells:
+                if self.values[i] != "0":
+                    bit = geo.value_bits[self.values[i]]
+                    if mask & bit:
+                        raise Contradiction
+                    mask |= bit
+            if mask != solved[unit]:
+                raise Contradiction
+
+    def formatted_grid(self):
+        return format_grid(self.to_line())
+
+    def to_line(self):
+        """
+        :return: the grid's values as a single line, row by row, 81 characters for a 9x9 grid
+        """
+        return "".join(self.values)
+
+    def __str__(self):
+        g_v = []
+        size = self.geometry.size
+        for i in range(size):
+            g_v.append("".join(self.values[i * size:i * size + size]))
+        return "\n".join(g_v)
@@ -0,0 +1,125 @@
+"""
+Technique instrumentation
+counts how often each technique runs, how long it takes, and how many candidates it removes and cells it fills in.
+Grid.solve(instrument=True) installs it by shadowing the Grid's methods with counting wrappers for the length of the
+solve, so a normal solve runs the plain methods and pays nothing for it.
+"""
+import time
+
+
+class TechniqueStats:
+    """
+    what one technique did during a solve. The numbers are exclusive, i.e. when search() runs the forced placements
+    after a guess, their time and eliminations only count towards the forced placements
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0.0  # seconds
+        self.eliminated = 0  # candidates removed
+        self.placed = 0  # cells filled in
+
+    def as_dict(self):
+        return {"calls": self.calls, "time": self.time, "eliminated": self.eliminated, "placed": self.placed}
+
+    def __repr__(self):
+        return (f"TechniqueStats(calls={self.calls}, time={self.time:.6f}, eliminated={self.eliminated}, "
+                f"placed={self.placed})")
+
+
+class GridWrappers:
+    """
+    shadows some of a Grid's methods with wrappers for as long as it is installed, see wrappers(). trace.Tracer works
+    the same way
+    """
+
+    def __init__(self, grid):
+        """
+        :param grid: the Grid to wrap
+        """
+        self.grid = grid
+        self.installed = []  # the names of the methods shadowed by install()
+
+    def wrappers(self):
+        """
+        :return: a dictionary of the names of the Grid's methods to what to replace each with
+        """
+        raise NotImplementedError
+
+    def install(self):
+        wrappers = self.wrappers()
+        for name, wrapper in wrappers.items():
+            setattr(self.grid, name, wrapper)
+        self.installed = list(wrappers)
+
+    def uninstall(self):
+        # removing the instance attributes uncovers the Grid's own methods again
+        for name in self.installed:
+            self.grid.__dict__.pop(name, None)
+        self.installed = []
+
+
+class Instrumentation(GridWrappers):
+    """
+    wraps a Grid's techniques, eliminate() and place() for as long as it is installed
+    """
+
+    def __init__(self, grid, techniques):
+        """
+        :param grid: the Grid to instrument
+        :param techniques: the names of the Grid methods to keep stats for
+        """
+        GridWrappers.__init__(self, grid)
+        self.techniques = techniques
+        self.stats = {name: TechniqueStats() for name in techniques}
+        self.eliminated = 0
+        self.placed = 0
+        self.stack = []  # [time, eliminated, placed] spent in the techniques called by each running technique
+
+    def wrappers(self):
+        wrappers = {name: self.wrap(name, getattr(self.grid, name)) for name in self.techniques}
+        wrappers["eliminate"] = self.counting_eliminate(self.grid.eliminate)
+        wrappers["place"] = self.counting_place(self.grid.place)
+        return wrappers
+
+    def counting_eliminate(self, eliminate):
+        candidates = self.grid.candidates
+        bit_count = self.grid.geometry.bit_count
+
+        def wrapper(index, illegal_mask):
+            self.eliminated += bit_count[candidates[index] & illegal_mask]
+            eliminate(index, illegal_mask)
+        return wrapper
+
+    def counting_place(self, place):
+        def wrapper(index, val):
+            self.placed += 1
+            place(index, val)
+        return wrapper
+
+    def wrap(self, name, method):
+        stats = self.stats[name]
+
+        def wrapper(*args):
+            started = time.perf_counter()
+            eliminated = self.eliminated
+            placed = self.placed
+            self.stack.append([0.0, 0, 0])
+            try:
+                return method(*args)
+            finally:
+                inner_time, inner_eliminated, inner_placed = self.stack.pop()
+                elapsed = time.perf_counter() - started
+                eliminated = self.eliminated - eliminated
+                placed = self.placed - placed
+                stats.calls += 1
+                stats.time += elapsed - inner_time
+                stats.eliminated += eliminated - inner_eliminated
+                stats.placed += placed - inner_placed
+                # let the technique that called this one know not to count it twice
+                if self.stack:
+                    outer = self.stack[-1]
+                    outer[0] += elapsed
+                    outer[1] += eliminated
+                    outer[2] += placed
+        return wrapper
@@ -0,0 +1,116 @@
+"""
+Puzzle parsing
+turns every puzzle format the package accepts into one line, row by row, with 0 for each empty cell. The size of the
+grid comes from the number of cells: 81 for 9x9, and 16, 256, or 625 for 4x4, 16x16, and 25x25 grids. The line is
+checked in the same pass: it must only have the grid's values or a 0 or . for an empty cell, and no value given twice
+in a row, column, or box. Anything else raises InvalidPuzzleError before any solving work starts.
+
+The values are 1-9 and then letters, see units.ALPHABET, so a 16x16 grid uses 1-9 and A-G and a 25x25 one 1-9 and A-P.
+Letters can be given in either case, the line always has them in upper case.
+
+Accepted formats:
+    - a string of 81 characters (or 16, 256, or 625)
+    - a string of 9 rows (or 4, 16, or 25) separated with spaces (or any whitespace)
+    - a list (or tuple) of 9 row strings (or 4, 16, or 25)
+
+Variant grids (see variants.py) are given the same way, and checked against their own boxes, extra units, and cages.
+"""
+from .units import ALPHABET, BOX_SIZES, MAX_BOX_SIZE, MIN_BOX_SIZE, ROW_BOX_SIZES, geometry
+
+EMPTY = "0."
+VALID_CHARS = {n: frozenset(ALPHABET[:n * n] + ALPHABET[9:n * n].lower() + EMPTY)
+               for n in range(MIN_BOX_SIZE, MAX_BOX_SIZE + 1)}  # box size -> the characters a puzzle can have
+TO_ZERO = str.maketrans("." + ALPHABET[9:].lower(), "0" + ALPHABET[9:])
+
+INVALID = "invalid"  # what a malformed puzzle gets instead of a solution, in files, corpora and the server
+
+
+class InvalidPuzzleError(ValueError):
+    """
+    raised when a puzzle is malformed or gives the same value twice in a unit
+    """
+
+
+def parse(puzzle, geo=None):
+    """
+    :param puzzle: a puzzle in any of the accepted formats
+    :param geo: the Geometry of a variant grid to check the puzzle against, None for the classic grid of its size
+    :return: the puzzle as a line, row by row, with 0 for each empty cell. Its length is the number of cells, see
+    units.BOX_SIZES
+    """
+    if isinstance(puzzle, str):
+        rows = puzzle.split()
+        if len(rows) == 1:
+            line = rows[0]
+            if len(line) not in BOX_SIZES:
+                raise InvalidPuzzleError(f"expected 81 cells (or 16, 256, or 625), got {len(line)}")
+            return _checked(line, BOX_SIZES[len(line)], geo)
+    elif isinstance(puzzle, (list, tuple)):
+        rows = puzzle
+    else:
+        raise TypeError(f"a puzzle is a string or a list of row strings, not {type(puzzle).__name__}")
+
+    if len(rows) not in ROW_BOX_SIZES:
+        raise InvalidPuzzleError(f"expected 9 rows (or 4, 16, or 25), got {len(rows)}")
+    for x, row in enumerate(rows):
+        if not isinstance(row, str):
+            raise TypeError(f"row {x + 1} is a {type(row).__name__}, not a string")
+        if len(row) != len(rows):
+            raise InvalidPuzzleError(f"row {x + 1} has {len(row)} cells, expected {len(rows)}")
+    return _checked("".join(rows), ROW_BOX_SIZES[len(rows)], geo)
+
+
+def _checked(line, box_size, geo=None):
+    """
+    :param line: the puzzle's cells
+    :param box_size: how many cells across a box is, see units.geometry()
+    :param geo: the Geometry of a variant grid, see parse()
+    :return: line with . swapped for 0 and letters in upper case, if it only has valid characters and no value twice
+    in a unit
+    """
+    if geo is None:
+        geo = geometry(box_size)
+    elif geo.box_size != box_size:
+        raise InvalidPuzzleError(f"expected {geo.cell_count} cells, got {len(line)}")
+    valid = VALID_CHARS[box_size]
+    if not valid.issuperset(line):
+        index = next(i for i, char in enumerate(line) if char not in valid)
+        raise InvalidPuzzleError(f"unexpected character {line[index]!r} in row {geo.row_of[index] + 1}, "
+                                 f"column {geo.col_of[index] + 1}")
+    line = line.translate(TO_ZERO)
+
+    value_bits = geo.value_bits
+    row_of = geo.row_of
+    col_of = geo.col_of
+    box_of = geo.box_of
+    rows = [0] * geo.size
+    cols = [0] * geo.size
+    boxes = [0] * geo.size
+    for index, val in enumerate(line):
+        if val == "0":
+            continue
+        bit = value_bits[val]
+        x = row_of[index]
+        y = col_of[index]
+        box = box_of[index]
+        if (rows[x] | cols[y] | boxes[box]) & bit:
+            if rows[x] & bit:
+                unit = f"row {x + 1}"
+            elif cols[y] & bit:
+                unit = f"column {y + 1}"
+            else:
+                unit = f"box {box + 1}"
+            raise InvalidPuzzleError(f"{val} is given twice in {unit}")
+        rows[x] |= bit
+        cols[y] |= bit
+        boxes[box] |= bit
+
+    # a variant's extra units and cages
+    for unit in range(3 * geo.size, len(geo.units)):
+        seen = 0
+        for index in geo.units[unit]:
+            bit = value_bits.get(line[index], 0)
+            if seen & bit:
+                raise InvalidPuzzleError(f"{line[index]} is given twice in {geo.unit_name(unit)}")
+            seen |= bit
+    return line
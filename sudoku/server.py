@@ -0,0 +1,206 @@
+"""
+Solving service
+an asyncio front end for the solver. Requests that arrive close together are grouped into micro-batches, and each
+batch is solved on an executor (a process pool by default) so the event loop never waits on a solve.
+
+Run it with python -m sudoku.server. The protocol is one line per request: send a puzzle, either as 81 characters or as
+9 rows separated with spaces (4x4, 16x16, and 25x25 puzzles work too, see parser.py), and get back a line with the
+solution, "unsolvable", "invalid", or "partial" if it ran out of time (see --time-limit). The time limit is for each
+puzzle, and a batch's puzzles are solved one after another on one worker, so the longest a request can take is about
+max_wait plus max_batch_size times the time limit (and whatever time it spends waiting for a free worker).
+Requests can be pipelined, the answers on a connection always come back in the order the puzzles were sent.
+"""
+import argparse
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .batch import solve_chunk
+
+MAX_PIPELINED = 1024  # requests a connection can have waiting for their answers before it stops reading more
+
+
+class BatchingSolver:
+    """
+    collects puzzles from any number of coroutines and solves them in batches
+    """
+
+    def __init__(self, executor=None, max_batch_size=64, max_wait=0.005, time_limit=None):
+        """
+        :param executor: concurrent.futures.Executor
+            Where the batches are solved, None for the event loop's default executor
+        :param max_batch_size: int
+            The most puzzles to solve in one batch
+        :param max_wait: float
+            How long in seconds the first puzzle of a batch waits for more to join it before the batch is sent off
+        :param time_limit: float
+            The most seconds to spend solving each puzzle, or None for no limit. A batch's puzzles are solved one after
+            another, so a whole batch can take up to max_batch_size times as long
+        """
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.time_limit = time_limit
+        self.queue = None  # (puzzle, future) pairs waiting for a batch, made in start() so it belongs to the loop
+        self.task = None
+        self.batches = set()  # the solve_batch() tasks still running, so they aren't lost or left behind by stop()
+
+    def start(self):
+        self.queue = asyncio.Queue()
+        self.task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """
+        stops collecting batches, waits for the batches already sent off, and cancels the puzzles that never made it
+        into one
+        """
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.gather(*self.batches, return_exceptions=True)
+        while not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            future.cancel()
+
+    async def solve(self, puzzle):
+        """
+        :param puzzle: a puzzle line, see parser.parse()
+        :return: the solution as a line, UNSOLVABLE, INVALID, or PARTIAL (see batch.solve_one())
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((puzzle.strip(), future))
+        return await future
+
+    async def run(self):
+        """
+        takes batches off the queue for as long as the solver is running. Each batch is solved in the background so
+        the next one can be collected meanwhile.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = loop.create_task(self.solve_batch(batch))
+            self.batches.add(task)
+            task.add_done_callback(self.batches.discard)
+
+    async def solve_batch(self, batch):
+        """
+        :param batch: a list of (puzzle, future) pairs, every future gets its puzzle's solution (or the exception)
+        """
+        puzzles = [puzzle for puzzle, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            solutions = await loop.run_in_executor(self.executor, solve_chunk, puzzles, self.time_limit)
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for (_, future), solution in zip(batch, solutions):
+            if not future.done():  # the caller may have given up on it
+                future.set_result(solution)
+
+
+async def handle_connection(solver, reader, writer):
+    """
+    answers every puzzle line sent on a connection, in order, until the client closes it
+    :param solver: the BatchingSolver to solve with
+    :param reader: asyncio.StreamReader
+    :param writer: asyncio.StreamWriter
+    """
+    # a task for each request, in the order they came in, then None once the client is done. Reading stops while it
+    # is full, so a client that sends faster than it reads can't pile up work
+    answers = asyncio.Queue(MAX_PIPELINED)
+
+    async def write_answers():
+        while True:
+            task = await answers.get()
+            if task is None:
+                break
+            writer.write((await task + "\n").encode("ascii"))
+            await writer.drain()
+
+    writing = asyncio.get_running_loop().create_task(write_answers())
+    try:
+        async for line in reader:
+            line = line.decode("ascii", "replace").strip()
+            if line:
+                await answers.put(asyncio.ensure_future(solver.solve(line)))
+        await answers.put(None)
+        await writing
+    finally:
+        writing.cancel()
+        while not answers.empty():
+            task = answers.get_nowait()
+            if task is not None:
+                task.cancel()
+        writer.close()
+
+
+async def serve(host="127.0.0.1", port=8765, executor=None, max_batch_size=64, max_wait=0.005, time_limit=None):
+    """
+    starts the service, use port 0 to be given a free port
+    :param host: the address to listen on
+    :param port: the port to listen on
+    :param executor: where the batches are solved, see BatchingSolver. A process pool should not fork its workers
+    once connections are open, see run_server()
+    :param max_batch_size: the most puzzles in one batch
+    :param max_wait: how long in seconds a batch waits to fill up
+    :param time_limit: the most seconds to spend solving each puzzle, or None for no limit
+    :return: (server, solver), an asyncio Server that is already listening and the BatchingSolver behind it
+    """
+    solver = BatchingSolver(executor, max_batch_size, max_wait, time_limit)
+    solver.start()
+    server = await asyncio.start_server(lambda reader, writer: handle_connection(solver, reader, writer), host, port)
+    return server, solver
+
+
+async def run_server(args):
+    # forked workers would hold on to copies of the open connections, so they never closed, spawn them instead
+    with ProcessPoolExecutor(args.workers or None, multiprocessing.get_context("spawn")) as executor:
+        time_limit = args.time_limit / 1000 if args.time_limit else None
+        server, solver = await serve(args.host, args.port, executor, args.max_batch_size, args.max_wait / 1000,
+                                     time_limit)
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Solving sudoku on {host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await solver.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solves sudoku puzzles sent over TCP, one puzzle per line.")
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on (default: 127.0.0.1)")
+    parser.add_argument("-p", "--port", type=int, default=8765, help="the port to listen on, 0 for any (default: 8765)")
+    parser.add_argument("-w", "--workers", type=int, default=0,
+                        help="how many processes to solve with, 0 for one per CPU (default: 0)")
+    parser.add_argument("-b", "--max-batch-size", type=int, default=64,
+                        help="the most puzzles to solve in one batch (default: 64)")
+    parser.add_argument("--max-wait", type=float, default=5.0,
+                        help="how many milliseconds a batch waits for more puzzles (default: 5)")
+    parser.add_argument("-t", "--time-limit", type=float, default=0,
+                        help="the most milliseconds to spend solving each puzzle, 0 for no limit (default: 0). A "
+                             "batch's puzzles are solved one after another, so a batch takes up to --max-batch-size "
+                             "times as long")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_server(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
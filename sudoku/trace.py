@@ -0,0 +1,223 @@
+"""
+Solve traces
+Grid.trace() solves a puzzle one deduction at a time, for hints and step by step explanations. Like instrument.py it
+shadows the Grid's techniques, eliminate(), place() and restore() with recording wrappers, but only for as long as the
+trace is being read, so solve() pays nothing for it. The trace runs the Grid's own scheduler and search with
+Grid.pausing set, so they stop after every technique call (see Grid.stage_steps()) to hand over what it did, and a
+caller that only wants the first hint can stop there and nothing more is solved.
+
+Candidates that are only ruled out because a peer has that value, from the givens or from a value just placed, are
+part of filling that value in and aren't deductions of their own. A guess that leads to a contradiction keeps the
+deductions made on the way to it, followed by the UNDO that takes them back with the guess.
+"""
+from .grid import Contradiction
+from .instrument import GridWrappers
+from .units import UNIT_KINDS
+
+PLACE = "place"  # a technique filled a cell in
+ELIMINATE = "eliminate"  # a technique ruled candidates out of a cell
+GUESS = "guess"  # search tried a value
+UNDO = "undo"  # search took a guess back, along with everything that followed it
+
+NAKED_SINGLE = "naked_single"  # the technique of cells that fill themselves in when only one value is left
+SEARCH = "search"
+
+# what a running technique is in the middle of, see Tracer.stack
+_PLACING = (PLACE, None)
+_ELIMINATING = (ELIMINATE, None)
+_FILLING = (ELIMINATE, PLACE)  # eliminating down to the one value the technique is filling in
+
+
+class Deduction:
+    """
+    one step of a solve, see Grid.trace()
+    """
+
+    def __init__(self, kind, technique, unit, index, coords, value=None, eliminated=()):
+        """
+        :param kind: str
+            PLACE, ELIMINATE, GUESS, or UNDO
+        :param technique: str
+            The Grid method that made it (e.g. "row_forced_placement"), NAKED_SINGLE, or SEARCH
+        :param unit: tuple
+            (kind, number) of the unit the technique was looking at, e.g. ("row", 3) counting from 0, or None for naked
+            singles and search
+        :param index: int
+            The cell's position in the Grid's flat arrays
+        :param coords: tuple
+            The cell's (x, y)
+        :param value: str
+            The value filled in, guessed, or taken back, None for ELIMINATE
+        :param eliminated: list
+            The values ruled out of the cell. A technique that rules out all but one value fills the cell in, so its
+            PLACE has them too
+        """
+        self.kind = kind
+        self.technique = technique
+        self.unit = unit
+        self.index = index
+        self.coords = coords
+        self.value = value
+        self.eliminated = list(eliminated)
+
+    def __str__(self):
+        x, y = self.coords
+        where = f"r{x + 1}c{y + 1}"
+        if self.unit is not None:
+            where += f" ({self.unit[0]} {self.unit[1] + 1})"
+        if self.kind == PLACE:
+            return f"{self.technique}: {where} is {self.value}"
+        if self.kind == ELIMINATE:
+            return f"{self.technique}: {where} can't be {', '.join(self.eliminated)}"
+        if self.kind == GUESS:
+            return f"{self.technique}: guess {where} is {self.value}"
+        return f"{self.technique}: take back {where} is {self.value}"
+
+    def __repr__(self):
+        return (f"Deduction({self.kind!r}, {self.technique!r}, {self.unit!r}, {self.index!r}, {self.coords!r}, "
+                f"{self.value!r}, {self.eliminated!r})")
+
+
+class Tracer(GridWrappers):
+    """
+    wraps a Grid's techniques, eliminate(), place() and restore() for as long as it is installed, and keeps the
+    Deductions they make until they are taken with flush()
+    """
+
+    def __init__(self, grid):
+        """
+        :param grid: the Grid to trace
+        """
+        GridWrappers.__init__(self, grid)
+        self.events = []
+        self.stack = []  # (technique, unit) of each running technique, or _PLACING etc. inside them
+        self.guesses = []  # (index, value) of each of search's guesses that hasn't been taken back
+        # every technique the grid's stages run -> the kind of unit it looks at
+        self.techniques = {"box_check": 2}
+        for stage in grid.stages:
+            for kind, names in enumerate(stage):
+                for name in names:
+                    self.techniques[name] = kind
+
+    def wrappers(self):
+        wrappers = {name: self.wrap(name, kind, getattr(self.grid, name)) for name, kind in self.techniques.items()}
+        wrappers["eliminate"] = self.recording_eliminate(self.grid.eliminate)
+        wrappers["place"] = self.recording_place(self.grid.place)
+        wrappers["restore"] = self.recording_restore(self.grid.restore)
+        return wrappers
+
+    def flush(self):
+        """
+        :return: the Deductions made since the last flush()
+        """
+        events = self.events
+        self.events = []
+        return events
+
+    def deduction(self, kind, technique, unit, index, value=None, eliminated=()):
+        """
+        records a Deduction about the cell at index, see Deduction for the rest
+        """
+        geo = self.grid.geometry
+        self.events.append(Deduction(kind, technique, unit, index, (geo.row_of[index], geo.col_of[index]), value,
+                                     eliminated))
+
+    def recording_eliminate(self, eliminate):
+        candidates = self.grid.candidates
+        mask_values = self.grid.geometry.mask_values
+        stack = self.stack
+
+        def wrapper(index, illegal_mask):
+            removed = candidates[index] & illegal_mask
+            frame = _ELIMINATING
+            if removed and stack:
+                technique, unit = stack[-1]
+                # box_check() only clears the givens out of the candidates, and place() its value out of the peers
+                if stack[-1] is not _PLACING and technique != "box_check":
+                    remaining = candidates[index] & ~illegal_mask
+                    if remaining and not remaining & (remaining - 1):
+                        # leaving one value fills the cell in, that is what the technique did
+                        self.deduction(PLACE, technique, unit, index, mask_values[remaining][0],
+                                       mask_values[removed])
+                        frame = _FILLING
+                    else:
+                        self.deduction(ELIMINATE, technique, unit, index, eliminated=mask_values[removed])
+            stack.append(frame)
+            try:
+                eliminate(index, illegal_mask)
+            finally:
+                stack.pop()
+        return wrapper
+
+    def recording_place(self, place):
+        stack = self.stack
+
+        def wrapper(index, val):
+            # only search places values outside of a technique, and the techniques' placements are recorded by
+            # eliminate()
+            if not stack:
+                self.guesses.append((index, val))
+                self.deduction(GUESS, SEARCH, None, index, val)
+            elif stack[-1] is not _FILLING:
+                if stack[-1] is _ELIMINATING:
+                    self.deduction(PLACE, NAKED_SINGLE, None, index, val)
+                else:
+                    technique, unit = stack[-1]
+                    self.deduction(PLACE, technique, unit, index, val)
+            stack.append(_PLACING)
+            try:
+                place(index, val)
+            finally:
+                stack.pop()
+        return wrapper
+
+    def recording_restore(self, restore):
+        def wrapper(snapshot):
+            restore(snapshot)
+            # search restores its snapshot once for every guess, the last guess first
+            if self.guesses:
+                index, val = self.guesses.pop()
+                self.deduction(UNDO, SEARCH, None, index, val)
+        return wrapper
+
+    def wrap(self, name, kind, method):
+        stack = self.stack
+        unit_kind = UNIT_KINDS[kind]
+
+        def wrapper(number):
+            stack.append((name, (unit_kind, number)))
+            try:
+                return method(number)
+            finally:
+                stack.pop()
+        return wrapper
+
+
+def deductions(grid, pipeline=None):
+    """
+    see Grid.trace()
+    :param grid: the Grid to solve
+    :param pipeline: the techniques to run, see Grid.solve()
+    :return: a generator of Deductions. It stops once the grid is solved, the techniques are stuck and there is no
+    search, or the puzzle turns out to have no solution
+    """
+    searching = grid.use_pipeline(pipeline)
+    tracer = Tracer(grid)
+    tracer.install()
+    grid.pausing = True
+    try:
+        for _ in grid.technique_steps():
+            yield from tracer.flush()
+
+        if searching and not grid.is_solved():
+            # the search pauses after every technique call as well as at a solution
+            for _ in grid.solutions():
+                yield from tracer.flush()
+                if grid.is_solved():
+                    break
+            yield from tracer.flush()  # the guesses taken back on the way out of a search with no solution
+    except Contradiction:
+        return
+    finally:
+        grid.pausing = False
+        tracer.uninstall()
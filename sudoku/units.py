@@ -0,0 +1,227 @@
+"""
+Unit tables
+the geometry of the grid, worked out once per size so the techniques never have to do coordinate arithmetic. A grid is
+made of n x n boxes of n x n cells, so it is size = n * n cells across: 4x4, 9x9, 16x16, or 25x25. Cells are referred
+to by their flat index, x * size + y, and every table is a tuple of those indices.
+    - boxes are numbered 0 | 1 | 2
+                         3 | 4 | 5
+                         6 | 7 | 8
+      in a 9x9 grid, and the same way (left to right, then top to bottom) in the other sizes
+
+STANDARD and UNITS are the 9x9 tables, see geometry() for the others. Variant grids (see variants.py) have their own
+Geometry, with their own boxes, extra units like diagonals, and killer cages.
+"""
+
+ALPHABET = "123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"  # the values of the grid sizes in order, 16x16 uses 1-9 and A-G
+MIN_BOX_SIZE = 2
+MAX_BOX_SIZE = 5
+BOX_SIZES = {n ** 4: n for n in range(MIN_BOX_SIZE, MAX_BOX_SIZE + 1)}  # number of cells -> box size
+ROW_BOX_SIZES = {n * n: n for n in range(MIN_BOX_SIZE, MAX_BOX_SIZE + 1)}  # number of rows -> box size
+
+UNIT_KINDS = ("row", "column", "box", "extra unit", "cage")  # the kinds of unit, in the order they are numbered in
+
+# the biggest grids whose mask lookup tables are built in full, bigger ones work the answers out as they are asked for
+TABLE_SIZE = 16
+VALUE_TABLE_SIZE = 9
+
+
+class MaskLookup:
+    """
+    looks masks up like one of the candidate mask tables (lookup[mask]), but works the answer out each time. Used
+    when a table with an entry for every mask would be too big, 2 ** 25 entries for a 25x25 grid.
+    """
+
+    __slots__ = ("function",)
+
+    def __init__(self, function):
+        """
+        :param function: the function of a mask to look up
+        """
+        self.function = function
+
+    def __getitem__(self, mask):
+        return self.function(mask)
+
+
+try:
+    _bit_count = int.bit_count  # python 3.10 and up
+except AttributeError:
+    def _bit_count(mask):
+        return bin(mask).count("1")
+
+
+class Geometry:
+    """
+    every table for one size of grid. Make them with geometry(), so each size is only worked out once and grids of the
+    same size share their tables.
+    """
+
+    def __init__(self, box_size, boxes=None, extra_units=(), cages=()):
+        """
+        :param box_size: int
+            How many cells across a box is, 3 for a 9x9 grid
+        :param boxes: tuple
+            The cells of each box, for grids whose boxes aren't n x n squares (jigsaw). None for the square ones
+        :param extra_units: tuple
+            The cells of each unit besides the rows, columns, and boxes that has every value once, like the diagonals
+        :param cages: tuple
+            The cells of each killer cage. A cage can't have a value twice, but doesn't have every value
+        """
+        n = box_size
+        size = n * n
+        self.box_size = n
+        self.size = size  # cells in a unit, and how many values there are
+        self.cell_count = size * size
+        self.symbols = ALPHABET[:size]  # the value of each candidate bit, in order
+
+        self.rows = tuple(tuple(range(x * size, x * size + size)) for x in range(size))
+        self.cols = tuple(tuple(range(y, self.cell_count, size)) for y in range(size))
+        if boxes is None:
+            corners = tuple((bx * n, by * n) for bx in range(n) for by in range(n))
+            self.boxes = tuple(tuple((x + r) * size + y + c for r in range(n) for c in range(n)) for x, y in corners)
+        else:
+            self.boxes = tuple(tuple(sorted(box)) for box in boxes)
+        self.corners = tuple(divmod(box[0], size) for box in self.boxes)  # each box's top left (x, y)
+        self.extra_units = tuple(tuple(sorted(unit)) for unit in extra_units)
+        self.cages = tuple(tuple(sorted(cage)) for cage in cages)
+        # rows are unit 0 to size - 1, then the columns, then boxes, then the extra units and cages of a variant
+        self.units = self.rows + self.cols + self.boxes + self.extra_units + self.cages
+        self.all_units = (1 << len(self.units)) - 1  # a bit for every unit
+        self.full_units = 3 * size + len(self.extra_units)  # the units before this have every value once
+        # (kind, number) of each unit, kind being its position in UNIT_KINDS
+        self.unit_places = tuple((kind, number) for kind, units in enumerate((self.rows, self.cols, self.boxes,
+                                                                               self.extra_units, self.cages))
+                                 for number in range(len(units)))
+
+        self.row_of = tuple(i // size for i in range(self.cell_count))
+        self.col_of = tuple(i % size for i in range(self.cell_count))
+        box_of = [0] * self.cell_count
+        for b, box in enumerate(self.boxes):
+            for i in box:
+                box_of[i] = b
+        self.box_of = tuple(box_of)
+
+        # the units each cell is in, and the bit of each of them, unit u being bit (1 << u), for marking units as
+        # changed
+        cell_units = [[] for _ in range(self.cell_count)]
+        for unit, cells in enumerate(self.units):
+            for i in cells:
+                cell_units[i].append(unit)
+        self.cell_unit_masks = tuple(sum(1 << unit for unit in units) for units in cell_units)
+        # the extra units and cages of each cell, by their number
+        self.cell_extras = tuple(tuple(u - 3 * size for u in units if 3 * size <= u < self.full_units)
+                                 for units in cell_units)
+        self.cell_cages = tuple(tuple(u - self.full_units for u in units if u >= self.full_units)
+                                for units in cell_units)
+
+        # the other cells that share a row, column, or box (or an extra unit or cage) with each cell
+        self.peers = tuple(tuple(sorted(set(i for unit in units for i in self.units[unit]) - {cell}))
+                           for cell, units in enumerate(cell_units))
+        self.peer_sets = tuple(frozenset(peers) for peers in self.peers)
+
+        # everything Grid.place() needs about each cell in one lookup: (row, column, box, unit mask, peers)
+        self.placements = tuple(zip(self.row_of, self.col_of, self.box_of, self.cell_unit_masks, self.peers))
+
+        self.box_rows = self._intersections(self.rows, self.row_of)
+        self.box_cols = self._intersections(self.cols, self.col_of)
+        self.extra_crossings = tuple(self._crossings(unit) for unit in self.extra_units)
+
+        # candidate masks, bit (v - 1) being set means the v-th symbol is still a legal value
+        self.all_candidates = (1 << size) - 1  # every value is still legal
+        self.value_bits = {val: 1 << i for i, val in enumerate(self.symbols)}  # "1" -> 0b1, "2" -> 0b10, ...
+        self.bits = list(self.value_bits.values())
+        masks = range(self.all_candidates + 1)
+        if size <= TABLE_SIZE:
+            self.bit_count = [_bit_count(mask) for mask in masks]  # popcount lookup table
+        else:
+            self.bit_count = MaskLookup(_bit_count)
+        if size <= VALUE_TABLE_SIZE:
+            self.mask_values = [self._values(mask) for mask in masks]
+            self.mask_indices = [self._indices(mask) for mask in masks]  # value - 1 of each bit
+        else:
+            self.mask_values = MaskLookup(self._values)
+            self.mask_indices = MaskLookup(self._indices)
+
+    def _values(self, mask):
+        """
+        :return: the values whose bits are set in mask, in order
+        """
+        return [self.symbols[v] for v in self._indices(mask)]
+
+    @staticmethod
+    def _indices(mask):
+        """
+        :return: the positions of the bits set in mask, lowest first
+        """
+        indices = []
+        while mask:
+            low = mask & -mask
+            indices.append(low.bit_length() - 1)
+            mask ^= low
+        return indices
+
+    def _intersections(self, lines, line_of):
+        """
+        :param lines: rows or cols
+        :param line_of: row_of or col_of
+        :return: for each box, a tuple of (line number, the cells in both the box and the line, the rest of the box,
+        the rest of the line) for each of the lines crossing the box
+        """
+        table = []
+        for box in self.boxes:
+            crossings = []
+            for line in sorted(set(line_of[i] for i in box)):
+                inside = tuple(i for i in box if line_of[i] == line)
+                crossings.append((line, inside,
+                                  tuple(i for i in box if i not in inside),
+                                  tuple(i for i in lines[line] if i not in inside)))
+            table.append(tuple(crossings))
+        return tuple(table)
+
+    def _crossings(self, unit):
+        """
+        :param unit: the cells of an extra unit
+        :return: a tuple of (other unit, the cells in both, the rest of one, the rest of the other) for each of the
+        other units with every value that cross unit in more than one cell, both ways round, so locked candidates
+        can be found in either unit, see Grid.locked_line()
+        """
+        crossings = []
+        for other, cells in enumerate(self.units[:self.full_units]):
+            inside = tuple(i for i in unit if i in cells)
+            if len(inside) > 1 and cells != unit:
+                unit_rest = tuple(i for i in unit if i not in inside)
+                other_rest = tuple(i for i in cells if i not in inside)
+                crossings.append((other, inside, unit_rest, other_rest))
+                crossings.append((other, inside, other_rest, unit_rest))
+        return tuple(crossings)
+
+    def unit_name(self, unit):
+        """
+        :param unit: a unit number, see units
+        :return: what to call it, e.g. "row 3", counting from 1
+        """
+        kind, number = self.unit_places[unit]
+        return f"{UNIT_KINDS[kind]} {number + 1}"
+
+    def __repr__(self):
+        return f"Geometry({self.box_size})"
+
+
+_geometries = {}  # box size -> Geometry
+
+
+def geometry(box_size):
+    """
+    :param box_size: how many cells across a box is, from MIN_BOX_SIZE to MAX_BOX_SIZE
+    :return: the Geometry of that size of grid, only worked out the first time it is asked for
+    """
+    if box_size not in _geometries:
+        if not MIN_BOX_SIZE <= box_size <= MAX_BOX_SIZE:
+            raise ValueError(f"boxes can be {MIN_BOX_SIZE} to {MAX_BOX_SIZE} cells across, not {box_size}")
+        _geometries[box_size] = Geometry(box_size)
+    return _geometries[box_size]
+
+
+STANDARD = geometry(3)  # the 9x9 grid
+
+UNITS = STANDARD.units  # all 27 units: rows are 0-8, columns 9-17, and boxes 18-26
@@ -0,0 +1,321 @@
+"""
+Sudoku variants
+X-Sudoku, jigsaw, and killer puzzles, and anything else that is a grid with more units or different boxes. A Variant
+describes the grid and builds its units.Geometry, and a VariantGrid solves puzzles on it with the same techniques and
+scheduler as a Grid:
+    - extra units, like the two diagonals of X-Sudoku, have every value once like a row does. They are numbered
+      after the boxes, and forced placement, locked candidates, and the naked and hidden subsets run on them too
+    - jigsaw boxes are any shape, given as a layout of one character per cell
+    - killer cages can't have a value twice, and their values add up to the cage's total. cage_sum() rules out
+      the values that aren't in any way of making the total, and place() never completes a cage with the wrong one
+
+The classic Grid doesn't know about any of it, everything a variant needs more is in VariantGrid, so classic puzzles
+are solved exactly as fast as before.
+"""
+import math
+from itertools import combinations
+
+from .grid import PIPELINE, TECHNIQUE_STAGES, TECHNIQUES, Contradiction, Grid, pipeline_stages
+from .parser import InvalidPuzzleError
+from .units import MAX_BOX_SIZE, MIN_BOX_SIZE, Geometry
+
+# the methods each technique runs on a changed extra unit and cage, after the ones for rows, columns, and boxes
+VARIANT_STAGES_EXTRA = {
+    "forced_placement": (("extra_forced_placement",), ("cage_sum",)),
+    "locked_candidates": (("locked_extra",), ()),
+    "naked_pairs": (("naked_extra_pair",), ()),
+    "hidden_pairs": (("hidden_extra_pair",), ()),
+    "triples": (("naked_extra_triple", "hidden_extra_triple"), ()),
+    "quads": (("naked_extra_quad", "hidden_extra_quad"), ()),
+}
+
+# TECHNIQUE_STAGES for variant grids, the same techniques with a method for each of the 5 kinds of unit
+VARIANT_TECHNIQUE_STAGES = {name: stages + VARIANT_STAGES_EXTRA.get(name, ((), ()))
+                            for name, stages in TECHNIQUE_STAGES.items()}
+
+VARIANT_STAGES = pipeline_stages(PIPELINE, VARIANT_TECHNIQUE_STAGES)[0]
+
+# every VariantGrid method solve() runs
+VARIANT_TECHNIQUES = TECHNIQUES[:-1] + ("extra_forced_placement", "cage_sum", "locked_extra", "naked_extra_pair",
+                                        "hidden_extra_pair", "naked_extra_triple", "hidden_extra_triple",
+                                        "naked_extra_quad", "hidden_extra_quad", "search")
+
+# cages with more ways to pick their values than this are only checked once they are filled in, see cage_sum()
+MAX_CAGE_COMBINATIONS = 10000
+
+
+class Variant:
+    """
+    the rules of a variant grid. Make one per kind of puzzle and share it between its VariantGrids
+    """
+
+    def __init__(self, box_size=3, diagonals=False, regions=None, units=(), cages=()):
+        """
+        :param box_size: int
+            How many cells across a box is, 3 for a 9x9 grid
+        :param diagonals: bool
+            If True, both diagonals have every value once (X-Sudoku)
+        :param regions: str
+            The boxes of a jigsaw grid, one character per cell row by row, cells with the same character are in the
+            same box. None for the usual square boxes
+        :param units: list
+            Any other units that have every value once, as lists of flat cell indices
+        :param cages: list
+            The killer cages, as (cells, total) with the flat indices of the cells and the sum of their values (the
+            letters of bigger grids count on from 10)
+        """
+        if not MIN_BOX_SIZE <= box_size <= MAX_BOX_SIZE:
+            raise ValueError(f"boxes can be {MIN_BOX_SIZE} to {MAX_BOX_SIZE} cells across, not {box_size}")
+        size = box_size * box_size
+        cell_count = size * size
+        self.box_size = box_size
+        self.diagonals = diagonals
+        self.regions = regions
+
+        boxes = None
+        if regions is not None:
+            if len(regions) != cell_count:
+                raise ValueError(f"regions has {len(regions)} cells, expected {cell_count}")
+            layout = {}
+            for i, label in enumerate(regions):
+                layout.setdefault(label, []).append(i)
+            if len(layout) != size or any(len(box) != size for box in layout.values()):
+                raise ValueError(f"regions has to be {size} boxes of {size} cells each")
+            boxes = tuple(layout.values())
+
+        extra_units = [tuple(unit) for unit in units]
+        if diagonals:
+            extra_units.append(tuple(i * size + i for i in range(size)))
+            extra_units.append(tuple(i * size + size - 1 - i for i in range(size)))
+        for unit in extra_units:
+            if len(set(unit)) != size or not all(0 <= i < cell_count for i in unit):
+                raise ValueError(f"a unit has to be {size} different cells, not {unit}")
+
+        used = set()
+        for cells, total in cages:
+            k = len(set(cells))
+            if not 1 <= k == len(cells) <= size or not all(0 <= i < cell_count for i in cells):
+                raise ValueError(f"a cage has to be 1 to {size} different cells, not {cells}")
+            if used & set(cells):
+                raise ValueError(f"cells {sorted(used & set(cells))} are in more than one cage")
+            used |= set(cells)
+            if not k * (k + 1) // 2 <= total <= k * (2 * size - k + 1) // 2:
+                raise ValueError(f"{k} different values can't add up to {total}")
+        self.cage_totals = tuple(total for _, total in cages)
+
+        self.geometry = Geometry(box_size, boxes, extra_units, [cells for cells, _ in cages])
+        # the masks of the values each cage's total can be made from, None when there are too many to go through
+        self.cage_combinations = tuple(self._combinations(len(cells), total, size) for cells, total in cages)
+
+    @staticmethod
+    def _combinations(count, total, size):
+        """
+        :return: a mask for each set of count different values that adds up to total, see cage_combinations
+        """
+        if math.comb(size, count) > MAX_CAGE_COMBINATIONS:
+            return None
+        return tuple(sum(1 << v for v in values) for values in combinations(range(size), count)
+                     if sum(values) + count == total)
+
+    def mask_sum(self, mask):
+        """
+        :return: the sum of the values in a candidate mask
+        """
+        return sum(self.geometry.mask_indices[mask]) + self.geometry.bit_count[mask]
+
+    def __repr__(self):
+        return (f"Variant({self.box_size}, diagonals={self.diagonals}, regions={self.regions!r}, "
+                f"{len(self.geometry.extra_units)} extra units, {len(self.cage_totals)} cages)")
+
+
+class VariantGrid(Grid):
+    """
+    a Grid with a Variant's rules. Everything else, solve(), trace(), count_solutions(), works as it does on a Grid
+    """
+
+    technique_stages = VARIANT_TECHNIQUE_STAGES
+    default_stages = VARIANT_STAGES
+    techniques = VARIANT_TECHNIQUES
+
+    def __init__(self, grid_values, variant):
+        """
+        :param grid_values: the puzzle, in any of the formats a Grid takes. Killer puzzles often have no givens at all
+        :param variant: the Variant whose rules it follows
+        """
+        self.variant = variant
+        Grid.__init__(self, grid_values, variant.geometry)
+        geo = self.geometry
+
+        self.s_extras = [0] * len(geo.extra_units)  # A mask for each extra unit with the solved values in it
+
+        self.s_cages = [0] * len(geo.cages)  # A mask for each cage with the solved values in it
+
+        for index, val in enumerate(self.values):
+            if val != "0":
+                bit = geo.value_bits[val]
+                for e in geo.cell_extras[index]:
+                    self.s_extras[e] |= bit
+                for c in geo.cell_cages[index]:
+                    self.s_cages[c] |= bit
+        for c, cells in enumerate(geo.cages):
+            if not self.cage_possible(c, self.s_cages[c]):
+                raise InvalidPuzzleError(f"the givens of {geo.unit_name(geo.full_units + c)} can't add up to "
+                                         f"{variant.cage_totals[c]}")
+
+        self.solved = (self.s_rows, self.s_cols, self.s_boxes, self.s_extras, self.s_cages)
+
+    def cage_possible(self, cage, solved):
+        """
+        :param cage: a cage number
+        :param solved: a mask of the values solved in the cage
+        :return: False if the values can't be part of the cage's total: they add up to more, or fill the cage and
+        add up to something else
+        """
+        placed = self.variant.mask_sum(solved)
+        total = self.variant.cage_totals[cage]
+        if self.geometry.bit_count[solved] == len(self.geometry.cages[cage]):
+            return placed == total
+        return placed < total
+
+    def place(self, index, val):
+        """
+        fills in the cell at index with val like Grid.place(), keeping the extra units and cages up to date, see
+        Grid.place()
+        """
+        geo = self.geometry
+        x, y, box_num, _, _ = geo.placements[index]
+        bit = geo.value_bits[val]
+        if bit & (self.s_rows[x] | self.s_cols[y] | self.s_boxes[box_num]):
+            raise Contradiction
+        extras = geo.cell_extras[index]
+        cages = geo.cell_cages[index]
+        for e in extras:
+            if bit & self.s_extras[e]:
+                raise Contradiction
+        for c in cages:
+            if bit & self.s_cages[c] or not self.cage_possible(c, self.s_cages[c] | bit):
+                raise Contradiction
+
+        # before Grid.place() goes on to the peers, which can fill more cells in
+        for e in extras:
+            self.s_extras[e] |= bit
+        for c in cages:
+            self.s_cages[c] |= bit
+        Grid.place(self, index, val)
+
+    def box_check(self, box_num):
+        """
+        removes the solved values of each Cell's units from its legal values like Grid.box_check(), including the
+        values solved in its extra units and cages
+        :param box_num: the box's numerical identifier
+        """
+        geo = self.geometry
+        for i in geo.boxes[box_num]:
+            if self.values[i] == "0":
+                solved = self.s_boxes[box_num] | self.s_cols[geo.col_of[i]] | self.s_rows[geo.row_of[i]]
+                for e in geo.cell_extras[i]:
+                    solved |= self.s_extras[e]
+                for c in geo.cell_cages[i]:
+                    solved |= self.s_cages[c]
+                self.eliminate(i, solved)
+
+    def save_state(self):
+        return Grid.save_state(self), self.s_extras.copy(), self.s_cages.copy()
+
+    def restore_state(self, state):
+        state, s_extras, s_cages = state
+        Grid.restore_state(self, state)
+        self.s_extras[:] = s_extras
+        self.s_cages[:] = s_cages
+
+    def restore(self, snapshot):
+        """
+        see Grid.restore(), the values the trail takes back out of their cells are taken back out of their extra
+        units and cages too
+        """
+        if self.trail is not None:
+            geo = self.geometry
+            for index, _, bit in self.trail[snapshot[0]:]:
+                if bit:
+                    for e in geo.cell_extras[index]:
+                        self.s_extras[e] ^= bit
+                    for c in geo.cell_cages[index]:
+                        self.s_cages[c] ^= bit
+        Grid.restore(self, snapshot)
+
+    def check(self):
+        """
+        see Grid.check(), filled in cages also have to add up to their total
+        :raises Contradiction: if the grid is no longer consistent
+        """
+        Grid.check(self)
+        for c in range(len(self.s_cages)):
+            if not self.cage_possible(c, self.s_cages[c]):
+                raise Contradiction
+
+    def extra_forced_placement(self, number):
+        """
+        fills in the values that only have one place left in an extra unit, see forced_placement()
+        :param number: which extra unit
+        """
+        self.forced_placement(self.geometry.extra_units[number], self.s_extras[number])
+
+    def locked_extra(self, number):
+        """
+        finds values of an extra unit that are only legal where it crosses another unit, and removes them from the
+        rest of the other unit, and the other way round, see locked_line()
+        :param number: which extra unit
+        """
+        self.locked_line(self.geometry.extra_crossings[number])
+
+    def naked_extra_pair(self, number):
+        self.naked_pair(self.geometry.extra_units[number])
+
+    def hidden_extra_pair(self, number):
+        cells = self.geometry.extra_units[number]
+        self.hidden_pair(cells, self.value_locations(cells, self.s_extras[number]))
+
+    def naked_extra_triple(self, number):
+        self.naked_subset(self.geometry.extra_units[number], 3)
+
+    def hidden_extra_triple(self, number):
+        cells = self.geometry.extra_units[number]
+        self.hidden_subset(cells, self.value_locations(cells, self.s_extras[number]), 3)
+
+    def naked_extra_quad(self, number):
+        self.naked_subset(self.geometry.extra_units[number], 4)
+
+    def hidden_extra_quad(self, number):
+        cells = self.geometry.extra_units[number]
+        self.hidden_subset(cells, self.value_locations(cells, self.s_extras[number]), 4)
+
+    def cage_sum(self, number):
+        """
+        removes the values from a cage's empty cells that aren't in any set of values that makes its total: a set
+        has to hold the values already solved in the cage, and the empty cells have to be able to take the rest of
+        it between them
+        :param number: which cage
+        """
+        combos = self.variant.cage_combinations[number]
+        empty = [i for i in self.geometry.cages[number] if self.candidates[i]]
+        if combos is None or not empty:
+            return
+        solved = self.s_cages[number]
+        allowed = 0
+        for combo in combos:
+            if combo & solved != solved:
+                continue
+            needed = combo & ~solved
+            covered = 0
+            for i in empty:
+                legal = self.candidates[i] & needed
+                if not legal:
+                    break
+                covered |= legal
+            else:
+                if covered == needed:
+                    allowed |= needed
+        if not allowed:
+            raise Contradiction
+        for i in empty:
+            self.eliminate(i, ~allowed)
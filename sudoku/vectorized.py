@@ -0,0 +1,149 @@
+"""
+Vectorized batch engine
+stores a batch of N puzzles as an (N, 81) uint16 array of candidate masks and fills in naked and hidden singles on
+all of them at once with numpy. Most easy and medium puzzles are solved by singles alone, so only the ones that are
+left with empty cells go on to a Grid (and its techniques and search).
+
+numpy is optional, everything else in the package works without it. The arrays are laid out for 9x9 grids, puzzles of
+other sizes in a batch go straight to a Grid.
+"""
+from itertools import islice
+
+from .grid import ALL_CANDIDATES, UNSOLVABLE, Grid
+from .parser import INVALID, InvalidPuzzleError, parse
+from .units import UNITS
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+if np is not None:
+    UNIT_INDEX = np.array(UNITS, dtype=np.intp)  # (27, 9) the cells of each unit
+    CELL_UNIT_INDEX = np.array([[u for u, unit in enumerate(UNITS) if i in unit] for i in range(81)],
+                               dtype=np.intp)  # (81, 3) the units of each cell
+    # the character of the value a single-bit mask stands for, "0" for anything else
+    MASK_CHARS = np.array([ord(str(mask.bit_length())) if mask and not mask & (mask - 1) else ord("0")
+                           for mask in range(ALL_CANDIDATES + 1)], dtype=np.uint8)
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("the vectorized engine needs numpy, install it with pip install numpy")
+
+
+def to_masks(lines):
+    """
+    :param lines: a list of puzzles as 81 character lines, see parser.parse()
+    :return: an (N, 81) uint16 array with a single bit for every given and every candidate for every empty cell
+    """
+    _require_numpy()
+    text = "".join(lines).encode("ascii")
+    digits = np.frombuffer(text, dtype=np.uint8).reshape(len(lines), 81).astype(np.int16) - ord("0")
+    given = digits != 0
+    bits = np.left_shift(1, np.where(given, digits - 1, 0)).astype(np.uint16)
+    return np.where(given, bits, np.uint16(ALL_CANDIDATES)).astype(np.uint16)
+
+
+def propagate_singles(masks):
+    """
+    fills in naked and hidden singles on every grid at once until none of them changes any more. Grids are only
+    worked on for as long as they keep changing.
+    :param masks: an (N, 81) uint16 array from to_masks(), updated in place
+    :return: a bool array of length N, False for grids that turned out to have no solution
+    """
+    _require_numpy()
+    ok = np.ones(len(masks), dtype=bool)
+    active = np.arange(len(masks))
+    while len(active):
+        before = masks[active]
+        grids = before.copy()
+
+        # naked singles: cells with one candidate are solved, so remove their value from every other cell in the unit
+        single = (grids & (grids - 1)) == 0
+        solved_bits = np.where(single, grids, 0).astype(np.uint16)
+        unit_bits = solved_bits[:, UNIT_INDEX]  # (n, 27, 9)
+        unit_solved = np.bitwise_or.reduce(unit_bits, axis=2)
+        # a value solved twice in a unit adds up to more than the bits it sets
+        good = (unit_bits.sum(axis=2, dtype=np.int32) == unit_solved).all(axis=1)
+        seen = np.bitwise_or.reduce(unit_solved[:, CELL_UNIT_INDEX], axis=2)  # (n, 81)
+        grids = np.where(single, grids, grids & ~seen).astype(np.uint16)
+
+        # hidden singles: a value that only has one place to go in a unit goes there
+        unit_masks = grids[:, UNIT_INDEX]
+        once = np.zeros(unit_solved.shape, dtype=np.uint16)
+        for value in range(9):
+            count = ((unit_masks >> value) & 1).sum(axis=2)
+            good &= (count > 0).all(axis=1)  # a value with nowhere to go
+            once |= np.where(count == 1, np.uint16(1 << value), np.uint16(0))
+        hidden = grids & np.bitwise_or.reduce(once[:, CELL_UNIT_INDEX], axis=2)
+        forced = (hidden != 0) & ~((grids & (grids - 1)) == 0)
+        good &= ~(forced & ((hidden & (hidden - 1)) != 0)).any(axis=1)  # two values forced into one cell
+        grids = np.where(forced, hidden, grids).astype(np.uint16)
+        good &= (grids != 0).all(axis=1)
+
+        masks[active] = grids
+        ok[active] &= good
+        # keep going with the grids that changed and can still be solved
+        changed = (grids != before).any(axis=1) & good
+        active = active[changed]
+    return ok
+
+
+def solve_batch(puzzles):
+    """
+    solves a batch of puzzles, filling in singles on all of them at once and handing the rest to Grid
+    :param puzzles: a list of puzzles Grid accepts
+    :return: a list of the solutions as lines, UNSOLVABLE, or INVALID, in the same order as puzzles
+    """
+    _require_numpy()
+    if not puzzles:
+        return []
+    lines = []
+    valid = np.ones(len(puzzles), dtype=bool)
+    others = {}  # position -> solution of the puzzles that aren't 9x9
+    for i, puzzle in enumerate(puzzles):
+        try:
+            line = parse(puzzle)
+        except InvalidPuzzleError:
+            line = None
+            valid[i] = False
+        if line is not None and len(line) != 81:
+            result = Grid(line).solve()
+            others[i] = result.grid if result.solved else UNSOLVABLE
+            line = None
+        lines.append(line or "0" * 81)  # keeps the rows lined up, its answer is never used
+    masks = to_masks(lines)
+    ok = propagate_singles(masks)
+    solved = ((masks & (masks - 1)) == 0).all(axis=1) & ok
+    lines = MASK_CHARS[masks].view("S81").ravel()  # each grid's singles as an 81 character line
+
+    results = []
+    for i in range(len(puzzles)):
+        if not valid[i]:
+            results.append(INVALID)
+        elif i in others:
+            results.append(others[i])
+        elif not ok[i]:
+            results.append(UNSOLVABLE)
+        elif solved[i]:
+            results.append(lines[i].decode("ascii"))
+        else:
+            # start a Grid from everything the singles filled in
+            line = lines[i].decode("ascii")
+            result = Grid(line).solve()
+            results.append(result.grid if result.solved else UNSOLVABLE)
+    return results
+
+
+def solve_vectorized(puzzles, batch_size=4096):
+    """
+    streams puzzles through solve_batch() batch_size at a time, so memory stays the same no matter how many there are
+    :param puzzles: any iterable of puzzles Grid accepts
+    :param batch_size: how many puzzles go into each array
+    :return: a generator of the solutions, see solve_batch()
+    """
+    _require_numpy()
+    puzzles = iter(puzzles)
+    for batch in iter(lambda: list(islice(puzzles, batch_size)), []):
+        yield from solve_batch(batch)
@@ -0,0 +1,95 @@
+"""
+bugs found in the solver, each checked on the smallest case that showed it
+"""
+import random
+
+import pytest
+
+from sudoku import PARTIAL, Contradiction, Grid, InvalidPuzzleError
+from sudoku.corpus import EMPTY_LINE, STATUS_INVALID, encode_record
+from sudoku.generator import generate_puzzles, random_solution
+
+
+def assert_solves(puzzle, solution):
+    """
+    checks solution is a complete, consistent grid that keeps every given of puzzle
+    """
+    line = Grid(puzzle).to_line()
+    assert "0" not in solution
+    assert all(given in ("0", value) for given, value in zip(line, solution))
+    Grid(solution).check()
+
+
+def test_two_values_forced_into_one_cell():
+    # 1 and 2 can only go in the row's first cell, which can't hold both. forced_placement() used to keep
+    # trying to fill it in
+    grid = Grid("0" * 81)
+    for i in range(1, 9):
+        grid.candidates[i] &= ~0b11
+    grid.candidates[0] = 0b11
+    with pytest.raises(Contradiction):
+        grid.row_forced_placement(0)
+
+
+def test_forced_placement_hang_puzzle():
+    puzzle = "......52..8.4......3...9...5.1...6..2..7........3.....6...1..........7.4.......3."
+    result = Grid(puzzle).solve()
+    assert result.solved
+    assert_solves(puzzle, result.grid)
+
+
+def test_naked_subset_skips_filled_cells():
+    # a cell filled in by an earlier subset counted toward later triples and quads, and this came back unsolvable
+    puzzle = "000080501003001020000020080070930600000615274600200030000002000040000000150090000"
+    result = Grid(puzzle).solve()
+    assert result.solved
+    assert_solves(puzzle, result.grid)
+    assert Grid(puzzle).count_solutions(2) == 2
+
+
+def test_random_solution_4x4_is_complete():
+    # two random diagonal boxes often leave a 4x4 grid with no solution
+    rng = random.Random(2)
+    for _ in range(200):
+        solution = random_solution(rng, 2)
+        assert len(solution) == 16
+        assert_solves(solution, solution)
+
+
+def test_generate_4x4_puzzles():
+    for puzzle in generate_puzzles(5, box_size=2, seed=2):
+        assert Grid(puzzle.puzzle).count_solutions(2) == 1
+        assert Grid(puzzle.puzzle).solve().grid == puzzle.solution
+
+
+def test_pipeline_is_only_for_that_solve():
+    puzzle = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+    grid = Grid(puzzle)
+    assert grid.solve(pipeline=["forced_placement"]).status == PARTIAL
+    assert grid.solve().solved
+    assert grid.stages is Grid.default_stages
+
+    grid = Grid(puzzle)
+    assert grid.count_solutions(1, pipeline=["forced_placement"]) == 1
+    assert grid.count_solutions(1) == 1
+    assert grid.stages is Grid.default_stages
+
+
+def test_max_steps_and_stats_are_for_each_solve():
+    # the step count kept going from earlier solves of the same grid, and ran down the next one's budget
+    puzzle = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+    grid = Grid(puzzle)
+    first = grid.solve(pipeline=["forced_placement"])
+    assert first.stats["steps"] == grid.steps
+    second = grid.solve(max_steps=20)
+    assert second.status == PARTIAL
+    assert second.stats["steps"] == grid.steps - first.stats["steps"] > 20
+
+
+def test_from_record_of_an_invalid_puzzle_raises():
+    # it used to build an empty grid and solve that
+    with pytest.raises(InvalidPuzzleError):
+        Grid.from_record(encode_record(EMPTY_LINE, STATUS_INVALID))
+    puzzle = "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......"
+    grid = Grid.from_record(encode_record(Grid(puzzle).to_line()))
+    assert grid.solve().grid == Grid(puzzle).solve().grid
@@ -0,0 +1,66 @@
+"""
+the solving service, run on a local socket with a thread pool instead of worker processes
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from sudoku import Grid
+from sudoku.batch import INVALID
+from sudoku.server import serve
+
+PUZZLES = [
+    "4.....8.5.3..........7......2.....6.....8.4......1.......6.3.7.5..2.....1.4......",
+    "006080900 309760800 040201007 930000000 081649230 000000089 100408090 002037501 003010700",
+    "1.3...2...4.2.1.",
+    "52...6.........7.13...........4..8..6......5...........418.........3..2...87.....",
+]
+
+
+async def exchange(lines, **options):
+    """
+    :return: the answer lines the server sends back for lines, sent all at once on one connection
+    """
+    with ThreadPoolExecutor(2) as executor:
+        server, solver = await serve(port=0, executor=executor, **options)
+        try:
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write("".join(line + "\n" for line in lines).encode("ascii"))
+            await writer.drain()
+            writer.write_eof()
+            answers = [line.decode("ascii").strip() async for line in reader]
+            writer.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+            await solver.stop()
+    return answers
+
+
+def test_pipelined_answers_come_back_in_order():
+    lines = PUZZLES * 5
+    answers = asyncio.run(exchange(lines, max_batch_size=3))
+    assert answers == [Grid(puzzle).solve().grid for puzzle in lines]
+
+
+def test_bad_line_is_invalid():
+    lines = [PUZZLES[0], "not a puzzle", "11" + "." * 79, PUZZLES[2]]
+    answers = asyncio.run(exchange(lines))
+    assert answers == [Grid(PUZZLES[0]).solve().grid, INVALID, INVALID, Grid(PUZZLES[2]).solve().grid]
+
+
+def test_solver_stop_settles_every_request():
+    async def run():
+        with ThreadPoolExecutor(2) as executor:
+            server, solver = await serve(port=0, executor=executor, max_batch_size=2)
+            requests = [asyncio.ensure_future(solver.solve(puzzle)) for puzzle in PUZZLES * 3]
+            await asyncio.sleep(0.01)
+            server.close()
+            await server.wait_closed()
+            await solver.stop()
+            await asyncio.sleep(0)
+            return requests, solver
+
+    requests, solver = asyncio.run(run())
+    assert all(request.done() for request in requests)
+    assert not solver.batches